@@ -1,12 +1,60 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import numpy as np
-from datetime import datetime
+
+from figures import (
+    bar_figure,
+    grouped_bar_figure,
+    line_figure,
+    multi_line_figure,
+    pie_figure,
+    px_bar_figure,
+    stat_donut_figure,
+)
+from cards import metric_cards
+from compute import (
+    cohort_economics,
+    compute_service,
+    current_store,
+    refreshing_badge,
+    transaction_cube,
+)
+from data_store import REPORTING_CURRENCY, UNIT_SCALES
+from downsample import MAX_POINTS, zoom_range
+from forecasting import store_forecasts
+from kpis import (
+    company_kpis,
+    format_growth,
+    format_money,
+    format_number,
+    format_percent,
+    growth_suffix,
+    ratio_series,
+    roi,
+)
+from live_feed import live_panel
+from rollups import LEVELS, parse_periods
+from refresh import refresh_scheduler, rerun_on_refresh
+from profiling import debug_panel, plot_chart, section, start_metrics_server, start_rerun
+from scenarios import store_scenarios
+from specs import dashboard_plans
+from themes import (
+    AMEX_BLUSH,
+    AMEX_BURGUNDY,
+    AMEX_DUSTY_RED,
+    AMEX_LIGHT_RED,
+    AMEX_MEDIUM_RED,
+    AMEX_ROSE,
+    AMEX_WINE,
+    COMPANY_COLORS,
+    REVOLUT_BLUE,
+    REVOLUT_PURPLE,
+)
+from widgets import granularity_select, phase_scenario_panel, transaction_panel
 
 # Basic page setup
 st.set_page_config(layout="wide", page_title="Financial Dashboards Suite")
+start_rerun()
+start_metrics_server()
 # Simple CSS styling
 st.markdown(
     """
@@ -54,72 +102,75 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Create tabs
-tab1, tab2, tab3 = st.tabs(
-    ["🏦 Revolut Youth", "🏛️ Telda Case Study", "💳 American Express"]
-)
-
 # ====================== REVOLUT YOUTH TAB ======================
-with tab1:
+def render_revolut():
     st.title("🏦 Revolut Youth - Financial Performance Dashboard")
-    st.markdown(f"**Dashboard updated:** {datetime.now().strftime('%B %d, %Y')}")
+    store = current_store()
+    st.markdown(f"**Dashboard updated:** {store.loaded.strftime('%B %d, %Y %H:%M')}")
     st.markdown("---")
 
+    if st.session_state.get("live"):
+        live_panel("revolut")
+
     # Data definitions for Revolut
-    revenue_data = pd.DataFrame(
-        {"Year": ["FY20", "FY21", "FY22", "FY23"], "Revenue": [0, 25, 80, 188]}
-    )
+    forecasts = store_forecasts(store)
 
-    user_data = pd.DataFrame(
-        {"Year": [2019, 2020, 2021, 2022, 2023], "Users": [0, 0.2, 0.8, 1.5, 2.0]}
+    # Cumulative ROI per phase, from the same phase series as the scenario cards
+    phase_totals = store.frame(
+        "revolut",
+        {"phase_revenue": "revenue", "phase_investment": "investment"},
+        period="Phase",
     )
+    roi_data = pd.DataFrame({
+        "Phase": phase_totals["Phase"],
+        "ROI": roi(phase_totals["revenue"].cumsum(), phase_totals["investment"].cumsum()) * 100,
+    })
 
-    financial_projections = pd.DataFrame(
-        {
-            "Year": ["FY21", "FY23", "Proj. H1 2025"],
-            "Revenue": [25, 188, 145],
-            "Operating_Profit": [15, 122, 101.5],
-        }
+    cac_ltv_data = store.frame(
+        "revolut", {"cac": "CAC", "ltv": "LTV"}, period="Phase"
     )
 
-    roi_data = {
-        'Phase': ['Phase 1', 'Phase 2', 'Phase 3', 'Phase 4'],
-        'ROI': [-100, 52.8, 265.4, 630.9]
-    }
-
-    cac_ltv_data = {
-        'Phase': ['Phase 1', 'Phase 2', 'Phase 3', 'Phase 4'],
-        'CAC': [40, 20, 15, 10],
-        'LTV': [500, 550, 600, 650]
-    }
-
-    arpu_data = pd.DataFrame(
-        {"Year": ["FY20", "FY21", "FY23", "Proj. FY25"], "ARPU": [0, 10, 30, 55]}
-    )
+    # Raw cohort tables in data/cohorts/ take precedence over the phase series
+    economics = cohort_economics("revolut")
+    if economics is not None:
+        economics = economics.rename_axis("Phase").reset_index().astype({"Phase": str})
+        cac_ltv_data = economics.rename(columns={"cac": "CAC", "ltv": "LTV"})
+        roi_data = economics.assign(ROI=economics["cumulative_roi"] * 100)
 
     # Key Performance Indicators
     st.subheader("📊 Key Performance Indicators")
 
-    kpi_cols = st.columns(4)
-    kpis = [
-        ("Total Revenue (FY23)", "£188M", "+135% YoY"),
-        ("Active Users (2023)", "2.0M", "+33% YoY"),
-        ("ARPU (FY23)", "£94", "+213% YoY"),
-        ("Operating Margin", "65%", "Best in class"),
-    ]
-
-    for col, (label, value, change) in zip(kpi_cols, kpis):
-        with col:
-            st.markdown(
-                f"""
-            <div class="metric-card">
-                <div class="metric-label">{label}</div>
-                <div class="metric-value">{value}</div>
-                <div style="color: #38a169; font-weight: 500; font-size: 0.9rem;">{change}</div>
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
+    with section("revolut/kpi_cards"):
+        engine = company_kpis(store, "revolut", ("revenue", "users", "operating_profit"))
+        # Same revenue / users series as the ARPU chart
+        arpu = ratio_series(store, "revolut", "revenue", "users")
+        arpu_growth = None
+        if len(arpu) > 1 and arpu["value"].iloc[-2]:
+            arpu_growth = arpu["value"].iloc[-1] / arpu["value"].iloc[-2] - 1
+        kpis = [
+            (
+                f"Total Revenue ({engine.period('revenue')})",
+                format_money(engine.latest("revenue"), "£", "M"),
+                format_growth(engine.growth("revenue"), engine.growth_suffix("revenue")),
+            ),
+            (
+                f"Active Users ({engine.period('users')})",
+                f"{format_number(engine.latest('users'), decimals=1)}M",
+                format_growth(engine.growth("users"), engine.growth_suffix("users")),
+            ),
+            (
+                f"ARPU ({arpu['period'].iloc[-1]})",
+                format_money(arpu["value"].iloc[-1], "£", decimals=0),
+                format_growth(arpu_growth, growth_suffix(arpu["period"].iloc[-1])),
+            ),
+            (
+                "Operating Margin",
+                format_percent(engine.margin("operating_profit", "revenue"), decimals=0),
+                "Best in class",
+            ),
+        ]
+
+        metric_cards(kpis)
 
     st.markdown("---")
 
@@ -129,397 +180,267 @@ with tab1:
     chart_cols = st.columns(2)
 
     # Revenue Growth Chart
-    with chart_cols[0]:
-        fig_revenue = go.Figure()
-        fig_revenue.add_trace(
-            go.Scatter(
-                x=revenue_data["Year"],
-                y=revenue_data["Revenue"],
-                mode="lines+markers",
-                line=dict(color="#667eea", width=4),
-                marker=dict(size=8, color="#667eea"),
-                name="Revenue",
-                hovertemplate="<b>%{x}</b><br>Revenue: £%{y}M<extra></extra>",
-            )
+    with chart_cols[0], section("revolut/revenue_chart"):
+        level = granularity_select(store, "revolut", "revenue", key="level_revenue")
+        revenue_data = store.frame(
+            "revolut", {"revenue": "Revenue"}, period="Year", level=level
         )
 
-        fig_revenue.update_layout(
+        fig_revenue = line_figure(
+            zoom_range(revenue_data, "Year", key="zoom_revenue"),
+            "Year",
+            "Revenue",
+            color=REVOLUT_BLUE,
+            width=4,
+            marker_size=8,
+            marker_color=REVOLUT_BLUE,
+            name="Revenue",
+            hovertemplate="<b>%{x}</b><br>Revenue: £%{y}M<extra></extra>",
+            max_points=MAX_POINTS,
+            forecast=forecasts.forecast("revolut", "revenue") if level is None else None,
             title="Revenue Growth Trajectory",
-            xaxis_title="Fiscal Year",
+            xaxis_title=level.title() if level else "Fiscal Year",
             yaxis_title="Revenue (£M)",
             height=400,
+            template="revolut",
         )
 
-        st.plotly_chart(fig_revenue, use_container_width=True)
+        plot_chart(fig_revenue)
 
 
     # User Growth Chart
-    with chart_cols[1]:
-        fig_users = go.Figure()
-        fig_users.add_trace(
-            go.Scatter(
-                x=user_data["Year"],
-                y=user_data["Users"],
-                mode="lines+markers",
-                line=dict(color="#764ba2", width=4),
-                marker=dict(size=8, color="#764ba2"),
-                name="Users",
-                hovertemplate="<b>%{x}</b><br>Users: %{y}M<extra></extra>",
-            )
-        )
-
-        fig_users.update_layout(
+    with chart_cols[1], section("revolut/users_chart"):
+        level = granularity_select(store, "revolut", "users", key="level_users")
+        user_data = store.frame("revolut", {"users": "Users"}, period="Year", level=level)
+
+        fig_users = line_figure(
+            zoom_range(user_data, "Year", key="zoom_users"),
+            "Year",
+            "Users",
+            color=REVOLUT_PURPLE,
+            width=4,
+            marker_size=8,
+            marker_color=REVOLUT_PURPLE,
+            name="Users",
+            hovertemplate="<b>%{x}</b><br>Users: %{y}M<extra></extra>",
+            max_points=MAX_POINTS,
+            forecast=forecasts.forecast("revolut", "users") if level is None else None,
             title="User Growth Curve",
-            xaxis_title="Year",
+            xaxis_title=level.title() if level else "Year",
             yaxis_title="Users (Millions)",
             height=400,
+            template="revolut",
         )
 
-        st.plotly_chart(fig_users, use_container_width=True)
+        plot_chart(fig_users)
 
     # Revenue vs Profit Comparison
     st.subheader("📈 Revenue vs Operating Profit")
 
-    fig_comparison = go.Figure()
-
-    fig_comparison.add_trace(
-        go.Bar(
-            x=financial_projections["Year"],
-            y=financial_projections["Revenue"],
-            name="Revenue",
-            marker_color="#667eea",
+    with section("revolut/comparison_chart"):
+        # Reported periods followed by the projected ones. Projections are
+        # fiscal years, so they are only added to the reported granularity,
+        # each series on its own projected periods
+        level = granularity_select(store, "revolut", "revenue", key="level_comparison")
+        financial_projections = store.frame(
+            "revolut",
+            {"revenue": "Revenue", "operating_profit": "Operating_Profit"},
+            period="Year",
+            level=level,
         )
-    )
+        projected = []
+        if level is None:
+            for metric, column in (("revenue", "Revenue"), ("operating_profit", "Operating_Profit")):
+                forecast = forecasts.forecast("revolut", metric)
+                if forecast is not None:
+                    projected.append(
+                        pd.DataFrame(
+                            {
+                                "Year": "Proj. " + forecast["period"],
+                                column: forecast["value"],
+                                column + "_lower": forecast["lower"],
+                                column + "_upper": forecast["upper"],
+                                "start": parse_periods(forecast["period"])[1],
+                            }
+                        )
+                    )
+        if projected:
+            # One bar group per projected period, holding whichever series reach it
+            projected = (
+                pd.concat(projected).groupby("Year", as_index=False).first().sort_values("start")
+            )
+            financial_projections = pd.concat(
+                [financial_projections, projected.drop(columns="start")], ignore_index=True
+            )
 
-    fig_comparison.add_trace(
-        go.Bar(
-            x=financial_projections["Year"],
-            y=financial_projections["Operating_Profit"],
-            name="Operating Profit",
-            marker_color="#764ba2",
+        fig_comparison = grouped_bar_figure(
+            financial_projections,
+            "Year",
+            ("Revenue", "Operating_Profit"),
+            names=("Revenue", "Operating Profit"),
+            colors=(REVOLUT_BLUE, REVOLUT_PURPLE),
+            bands={
+                column: (column + "_lower", column + "_upper")
+                for column in ("Revenue", "Operating_Profit")
+                if column + "_lower" in financial_projections
+            },
+            title="Revenue vs Operating Profit Comparison",
+            xaxis_title=level.title() if level else "Fiscal Year",
+            yaxis_title="Amount (£M)",
+            height=400,
+            template="revolut",
         )
-    )
-
-    fig_comparison.update_layout(
-        title="Revenue vs Operating Profit Comparison",
-        xaxis_title="Fiscal Year",
-        yaxis_title="Amount (£M)",
-        barmode="group",
-        height=400,
-    )
 
-    st.plotly_chart(fig_comparison, use_container_width=True)
+        plot_chart(fig_comparison)
 
     # CAC vs LTV
-    fig_cac_ltv = go.Figure()
-    fig_cac_ltv.add_trace(go.Bar(
-        x=cac_ltv_data['Phase'],
-        y=cac_ltv_data['CAC'],
-        name='CAC',
-        marker_color='#764ba2'
-    ))
-    fig_cac_ltv.add_trace(go.Bar(
-        x=cac_ltv_data['Phase'],
-        y=cac_ltv_data['LTV'],
-        name='LTV',
-        marker_color='#667eea'
-    ))
-    fig_cac_ltv.update_layout(
-        title='CAC vs. LTV Progression (£)',
-        barmode='group',
-
-    )
-    st.plotly_chart(fig_cac_ltv, use_container_width=True)
-
-    import plotly.graph_objects as go
-
-    # Data
-    years = ['FY20', 'FY21', 'FY23', 'Proj. FY25']
-    arpu_values = [0, 20, 35, 60]
-
-    # Line Chart
-    fig_arpu = go.Figure()
-    fig_arpu.add_trace(go.Scatter(
-        x=years, y=arpu_values,
-        mode='lines+markers',
-        line=dict(color='#764ba2', width=3),
-        marker=dict(size=8),
-        name='ARPU (£/user/year)'
-    ))
-
-    fig_arpu.update_layout(
-        title='Annual Revenue Per User (ARPU)',
-        xaxis_title='Fiscal Year',
-        yaxis_title='ARPU (£)',
-        template='plotly_white',
-        margin=dict(l=40, r=40, t=60, b=40)
-    )
-    st.plotly_chart(fig_arpu, use_container_width=True)
-    # fig_arpu.show()
-
-    # Cumulative ROI
-    fig_roi = go.Figure()
-    fig_roi.add_trace(go.Scatter(
-        x=roi_data['Phase'],
-        y=roi_data['ROI'],
-        mode='lines+markers',
-        line=dict(color='#764ba2', width=2),
-        name='ROI'
-    ))
-    fig_roi.update_layout(
-        title='Cumulative ROI & Payback',
-        xaxis_title='Phase',
-        yaxis_title='ROI (%)'
-    )
-    st.plotly_chart(fig_roi, use_container_width=True)
-
-
-
-
-
-
-    # Strategic Phases Analysis
-    st.subheader("🚀 Strategic Phase Analysis")
-
-    phase_cols = st.columns(4)
-    phases_data = [
-        {
-            "title": "Foundation",
-            "phase": "Phase 1",
-            "investment": "£6M",
-            "revenue": "£0M",
-            "roi": "-100%",
-            "description": "Initial setup & infrastructure",
-        },
-        {
-            "title": "Growth",
-            "phase": "Phase 2",
-            "investment": "£14M",
-            "revenue": "£25M",
-            "roi": "+78.6%",
-            "description": "User acquisition & scaling",
-        },
-        {
-            "title": "Expansion",
-            "phase": "Phase 3",
-            "investment": "£10.5M",
-            "revenue": "£80M",
-            "roi": "+661.9%",
-            "description": "Market expansion & features",
-        },
-        {
-            "title": "Scale",
-            "phase": "Phase 4",
-            "investment": "£5M",
-            "revenue": "£188M",
-            "roi": "+3,660%",
-            "description": "Optimization & profitability",
-        },
-    ]
-
-    for col, phase in zip(phase_cols, phases_data):
-        with col:
-            roi_color = "#dc3545" if phase["roi"].startswith("-") else "#28a745"
-            st.markdown(
-                f"""
-            <div class="phase-card">
-                <h4 style="color: #667eea; margin: 0 0 0.5rem 0;">{phase['title']}</h4>
-                <p style="color: #6c757d; font-size: 0.85rem; margin: 0 0 1rem 0;">{phase['description']}</p>
-                <div style="margin: 1rem 0;">
-                    <div style="font-size: 0.9rem; margin: 0.3rem 0;">
-                        <strong>Investment:</strong> {phase['investment']}
-                    </div>
-                    <div style="font-size: 0.9rem; margin: 0.3rem 0;">
-                        <strong>Revenue:</strong> {phase['revenue']}
-                    </div>
-                    <div style="font-size: 1.2rem; font-weight: bold; color: {roi_color}; margin: 0.5rem 0;">
-                        ROI: {phase['roi']}
-                    </div>
-                </div>
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
-
-# ====================== TELDA CASE STUDY TAB ======================
-with tab2:
-    st.title("🏛️ Telda Case Study Dashboard")
-    st.markdown("---")
-
-    # User Growth Data
-    user_growth_data = pd.DataFrame(
-        {
-            "Date": pd.to_datetime(["Apr 2021", "Oct 2022", "2023"]),
-            "Users": [30000, 135000, 500000],
-        }
-    )
-
-    # Create two columns for the first row
-    col1, col2 = st.columns(2)
-
-    # User Growth Chart in first column
-    with col1:
-        st.subheader("Explosive User Growth (2021-2023)")
-        fig_growth = px.line(
-            user_growth_data, x="Date", y="Users", markers=True, line_shape="linear"
+    with section("revolut/cac_ltv_chart"):
+        fig_cac_ltv = grouped_bar_figure(
+            cac_ltv_data,
+            'Phase',
+            ('CAC', 'LTV'),
+            names=('CAC', 'LTV'),
+            colors=(REVOLUT_PURPLE, REVOLUT_BLUE),
+            title='CAC vs. LTV Progression (£)',
+            template="revolut",
         )
+        plot_chart(fig_cac_ltv)
 
-        # Update the line color to a dark brown and add markers
-        fig_growth.update_traces(
-            line=dict(color="#663300"), marker=dict(color="#663300")
+    # Line Chart
+    with section("revolut/arpu_chart"):
+        # Revenue per active user, derived like the ARPU card
+        level = granularity_select(store, "revolut", "revenue", key="level_arpu")
+        arpu_values = ratio_series(store, "revolut", "revenue", "users", level=level).rename(
+            columns={"period": "Year", "value": "ARPU"}
         )
 
-        # Update layout to match the image's style
-        fig_growth.update_layout(
-            xaxis_title="",
-            yaxis_title="",
-            showlegend=False,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            yaxis=dict(showgrid=True, gridcolor="#D3D3D3"),
-            xaxis=dict(showgrid=False),
-            font=dict(color="#000000", size=12),
-            height=400,
+        fig_arpu = line_figure(
+            arpu_values,
+            'Year',
+            'ARPU',
+            color=REVOLUT_PURPLE,
+            width=3,
+            marker_size=8,
+            name='ARPU (£/user/year)',
+            forecast=forecasts.ratio_forecast("revolut", "revenue", "users") if level is None else None,
+            title='Annual Revenue Per User (ARPU)',
+            xaxis_title=level.title() if level else 'Fiscal Year',
+            yaxis_title='ARPU (£)',
+            template="revolut+white",
+            margin=dict(l=40, r=40, t=60, b=40)
         )
-        st.plotly_chart(fig_growth, use_container_width=True)
-
-    # Financial Metrics in second column
-    with col2:
-        st.subheader("Robust Financial Performance")
-        col2_1, col2_2 = st.columns(2)
-
-        with col2_1:
-            st.metric("Transaction Volume (2023)", "$300M")
-        with col2_2:
-            st.metric("Revenue per Employee", "$143K")
+        plot_chart(fig_arpu)
 
-    # Create two columns for the second row
-    col3, col4 = st.columns(2)
-
-    # Users Under 30 Donut Chart
-    with col3:
-        st.subheader("Youth-Centric Product Design")
-        fig_donut = go.Figure(
-            data=[
-                go.Pie(
-                    labels=["Users Under 30", "Other Users"],
-                    values=[70, 30],
-                    hole=0.7,
-                    marker_colors=["#800020", "#4A0404"],
-                )
-            ]
-        )
-        fig_donut.update_layout(
-            annotations=[dict(text="70%", x=0.5, y=0.5, font_size=20, showarrow=False)],
-            height=400,
-        )
-        st.plotly_chart(fig_donut, use_container_width=True)
-
-        st.markdown(
-            """
-        - Mobile-first user experience
-        - Integrated social payment features (GIFs, emojis)
-        - Intuitive interface tailored for digital natives
-        """
+    # Cumulative ROI
+    with section("revolut/roi_chart"):
+        fig_roi = line_figure(
+            roi_data,
+            'Phase',
+            'ROI',
+            color=REVOLUT_PURPLE,
+            width=2,
+            name='ROI',
+            title='Cumulative ROI & Payback',
+            xaxis_title='Phase',
+            yaxis_title='ROI (%)',
+            template="revolut"
         )
+        plot_chart(fig_roi)
 
-    # Market Opportunity Pie Chart
-    with col4:
-        st.subheader("Market Opportunity: Egyptian Youth Segment")
-        fig_pie = go.Figure(
-            data=[
-                go.Pie(
-                    labels=["Youth (18-29)", "Other population"],
-                    values=[19.9, 80.1],
-                    hole=0,
-                    marker_colors=["#800020", "#4A0404"],
-                )
-            ]
-        )
-        fig_pie.update_layout(height=400)
-        st.plotly_chart(fig_pie, use_container_width=True)
-
-        st.markdown(
-            """
-        The youth segment (18-29) comprises 21.3M of the total population, 
-        representing a significant market opportunity.
-        """
-        )
+    # Strategic Phases Analysis
+    st.subheader("🚀 Strategic Phase Analysis")
 
-    # Footer
-    st.markdown("---")
-    st.markdown("*Data source: Telda Case Study 2023*")
+    with section("revolut/phase_cards"):
+        phases_data = [
+            {
+                "title": "Foundation",
+                "phase": "Phase 1",
+                "description": "Initial setup & infrastructure",
+            },
+            {
+                "title": "Growth",
+                "phase": "Phase 2",
+                "description": "User acquisition & scaling",
+            },
+            {
+                "title": "Expansion",
+                "phase": "Phase 3",
+                "description": "Market expansion & features",
+            },
+            {
+                "title": "Scale",
+                "phase": "Phase 4",
+                "description": "Optimization & profitability",
+            },
+        ]
+
+        # Investment, revenue and ROI per phase come from the phase series,
+        # under the assumptions picked in the panel (precomputed in scenarios.py)
+        phase_scenario_panel(store_scenarios(store), phases_data)
 
 # ====================== AMERICAN EXPRESS TAB ======================
-with tab3:
+def render_amex():
     st.title("💳 American Express Case Study")
     st.markdown("### 2024 Financial Highlights")
     st.markdown("---")
 
-    # Custom color scheme
-    COLOR_BURGUNDY = "#722F37"
-    COLOR_LIGHT_RED = "#A85751"
-    COLOR_MEDIUM_RED = "#8B3E3E"
-    COLOR_GOLD = "#FFD700"
+    if st.session_state.get("live"):
+        live_panel("amex")
 
-    import streamlit as st
-    import pandas as pd
-    import plotly.express as px
-
-    # Create two columns with equal width
-    col1, col2 = st.columns(2)
-
-    import streamlit as st
-    import pandas as pd
-    import plotly.express as px
+    store = current_store()
 
     # Create two columns with equal width
     col1, col2 = st.columns(2)
 
     # Chart 1: Revenue and Profit
-    with col1:
+    with col1, section("amex/results_chart"):
         st.subheader("Record Growth in (B$)")
         data1 = pd.DataFrame({
             "Category": ["Revenue", "Net Income"],
-            "Value": [ 65.9 , 10.1]
+            "Value": [
+                store.value("amex", "revenue", "2024"),
+                store.value("amex", "net_income", "2024"),
+            ],
         })
 
-        colors = ["#722F37", "#A85751"]
+        colors = [AMEX_BURGUNDY, AMEX_LIGHT_RED]
 
-        fig1 = px.bar(
+        fig1 = px_bar_figure(
             data1,
-            x="Category",
-            y="Value",
-            color= "Category",
-            color_discrete_sequence=colors,
+            "Category",
+            "Value",
+            colors=colors,
+            color="Category",
+            height=300,
+            template="amex",
         )
-        fig1.update_layout(height=300)
-        st.plotly_chart(fig1, use_container_width=True)
+        plot_chart(fig1)
 
     # Chart 2: ROI vs. Competitors
-    with col2:
+    with col2, section("amex/roi_chart"):
         st.subheader("ROI vs. Competitors")
         # All code within this block must be indented
-        roi_data = pd.DataFrame(
-            {"Company": ["American Express", "Visa", "Mastercard"], "ROI": [22.5, 18.3, 17.9]}
-        )
+        competitors = {"amex": "American Express", "visa": "Visa", "mastercard": "Mastercard"}
+        roi_data = pd.DataFrame({
+            "Company": list(competitors.values()),
+            "ROI": [store.value(company, "roi", "2024") for company in competitors],
+        })
 
-        colors = ["#722F37", "#A85751", "#8B3E3E"]
+        colors = [AMEX_BURGUNDY, AMEX_LIGHT_RED, AMEX_MEDIUM_RED]
 
-        fig2 = px.bar(
+        fig2 = px_bar_figure(
             roi_data,
-            x="Company",
-            y="ROI",
+            "Company",
+            "ROI",
+            colors=colors,
             color="Company",
-            color_discrete_sequence=colors,
             labels={"ROI": "ROI (%)"},
-        )
-        fig2.update_layout(
             title="",
             showlegend=False,
-            height=300
+            height=300,
+            template="amex"
         )
-        st.plotly_chart(fig2, use_container_width=True)
+        plot_chart(fig2)
 
 
 
@@ -528,42 +449,55 @@ with tab3:
     col3, col4 = st.columns(2)
 
     # Customer Value Growth
-    with col3:
-        years = [2019, 2020, 2021, 2022, 2023]
-        values = [350000, 385000, 420000, 455000, 490000]
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=years, y=values, mode="lines+markers", line=dict(color=COLOR_BURGUNDY)
-            )
+    with col3, section("amex/customer_value_chart"):
+        level = granularity_select(store, "amex", "customer_value", key="level_customer_value")
+        customer_value = store.frame(
+            "amex", {"customer_value": "Value"}, period="Year", level=level
         )
-        fig.update_layout(
+        projection = None if level else store_forecasts(store).forecast("amex", "customer_value")
+
+        fig = line_figure(
+            zoom_range(customer_value, "Year", key="zoom_customer_value"),
+            "Year",
+            "Value",
+            color=AMEX_BURGUNDY,
+            max_points=MAX_POINTS,
             title="Customer Value Growth",
-            xaxis_title="Year",
+            xaxis_title=level.title() if level else "Year",
             yaxis_title="Revenue per Customer ($)",
             height=300,
+            template="amex",
+            forecast=projection,
         )
-        st.plotly_chart(fig, use_container_width=True)
+        plot_chart(fig)
 
     # Customer Acquisition Cost
-    with col4:
-        quarters = ["Q1 2023", "Q2 2023", "Q3 2023", "Q4 2023", "Q1 2024"]
-        cac = [75, 72, 68, 65, 63]
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=quarters, y=cac, mode="lines+markers", line=dict(color=COLOR_BURGUNDY)
+    with col4, section("amex/cac_chart"):
+        # Quarterly acquisition cohorts, when present, replace the reported CAC
+        economics = cohort_economics("amex")
+        level = None
+        if economics is None:
+            level = granularity_select(store, "amex", "cac", key="level_amex_cac")
+            cac_data = store.frame("amex", {"cac": "CAC"}, period="Quarter", level=level)
+        else:
+            cac_data = (
+                economics.rename_axis("Quarter").reset_index()
+                .astype({"Quarter": str})
+                .rename(columns={"cac": "CAC"})
             )
-        )
-        fig.update_layout(
+
+        fig = line_figure(
+            cac_data,
+            "Quarter",
+            "CAC",
+            color=AMEX_BURGUNDY,
             title="Customer Acquisition Cost (CAC)",
-            xaxis_title="Quarter",
+            xaxis_title=level.title() if level else "Quarter",
             yaxis_title="Cost ($)",
             height=300,
+            template="amex",
         )
-        st.plotly_chart(fig, use_container_width=True)
+        plot_chart(fig)
 
     # Market Share and Investor Confidence
     st.subheader("📈 Market Performance")
@@ -571,54 +505,52 @@ with tab3:
     col5, col6 = st.columns(2)
 
     # Market Share
-    with col5:
-        years = ["2021", "2022", "2023"]
-        market_share = [18, 19, 21]
-        colors = ["#800020", "#B76E79", "#D8A7B1"]
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Bar(
-                x=years,
-                y=market_share,
-                marker_color=colors,
-                text=[f"{v}%" for v in market_share],
-                textposition="outside",
-            )
+    with col5, section("amex/market_share_chart"):
+        level = granularity_select(store, "amex", "market_share", key="level_market_share")
+        market_share = store.frame(
+            "amex", {"market_share": "Share"}, period="Year", level=level
         )
-        fig.update_layout(
+        colors = [AMEX_WINE, AMEX_ROSE, AMEX_BLUSH]
+
+        fig = bar_figure(
+            market_share,
+            "Year",
+            "Share",
+            colors=colors,
+            text_format="{:g}%",
             title="Market Share Growth",
-            xaxis_title="Year",
+            xaxis_title=level.title() if level else "Year",
             yaxis_title="Market Share (%)",
             height=300,
+            template="amex",
         )
-        st.plotly_chart(fig, use_container_width=True)
+        plot_chart(fig)
 
     # Investor Confidence
-    with col6:
-        dates = ["Jan 2020", "Mar 2025"]
-        confidence = [0, 120]
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=confidence,
-                mode="lines+markers",
-                line=dict(color="#800020", width=4),
-                marker=dict(size=8, color="#D8A7B1"),
-                name="Investor Confidence",
-            )
+    with col6, section("amex/confidence_chart"):
+        level = granularity_select(store, "amex", "investor_confidence", key="level_confidence")
+        confidence = store.frame(
+            "amex", {"investor_confidence": "Index"}, period="Date", level=level
         )
-        fig.update_layout(
+
+        fig = line_figure(
+            confidence,
+            "Date",
+            "Index",
+            color=AMEX_WINE,
+            width=4,
+            marker_size=8,
+            marker_color=AMEX_BLUSH,
+            name="Investor Confidence",
             title="Investor Confidence Index",
-            xaxis_title="Date",
+            xaxis_title=level.title() if level else "Date",
             yaxis_title="Confidence Index",
             yaxis=dict(range=[0, 130]),
             showlegend=False,
             height=300,
+            template="amex",
         )
-        st.plotly_chart(fig, use_container_width=True)
+        plot_chart(fig)
 
 
 
@@ -626,43 +558,43 @@ with tab3:
     col9, col10 = st.columns(2)
 
     # Profit Margin by Card Type
-    with col9:
-        card_types = ["Platinum", "Gold", "Green", "Cobrand"]
-        margins = [40, 30, 15, 15]
-
-        fig = go.Figure(
-            data=[
-                go.Pie(
-                    labels=card_types,
-                    values=margins,
-                    marker_colors=[
-                        COLOR_BURGUNDY,
-                        COLOR_MEDIUM_RED,
-                        COLOR_LIGHT_RED,
-                        "#B87070",
-                    ],
-                )
-            ]
+    with col9, section("amex/card_margin_chart"):
+        card_margins = store.frame(
+            "amex", {"card_margin": "Margin"}, period="Card"
         )
-        fig.update_layout(title="Profit Margin by Card Type", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+
+        fig = pie_figure(
+            card_margins,
+            "Card",
+            "Margin",
+            colors=[
+                AMEX_BURGUNDY,
+                AMEX_MEDIUM_RED,
+                AMEX_LIGHT_RED,
+                AMEX_DUSTY_RED,
+            ],
+            title="Profit Margin by Card Type",
+            height=400,
+            template="amex",
+        )
+        plot_chart(fig)
 
     # Growth Drivers
-    with col10:
-        categories = ["Gen Z/Millennials", "Other"]
-        distribution = [75, 25]
-
-        fig = go.Figure(
-            data=[
-                go.Pie(
-                    labels=categories,
-                    values=distribution,
-                    marker_colors=[COLOR_BURGUNDY, COLOR_LIGHT_RED],
-                )
-            ]
+    with col10, section("amex/growth_drivers_chart"):
+        growth_drivers = store.frame(
+            "amex", {"acquisition_mix": "Share"}, period="Segment"
+        )
+
+        fig = pie_figure(
+            growth_drivers,
+            "Segment",
+            "Share",
+            colors=[AMEX_BURGUNDY, AMEX_LIGHT_RED],
+            title="Growth Drivers - Customer Acquisition",
+            height=400,
+            template="amex",
         )
-        fig.update_layout(title="Growth Drivers - Customer Acquisition", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        plot_chart(fig)
 
 
 
@@ -673,148 +605,265 @@ with tab3:
 
 
         # Dividend Yield Chart
-        with col7:
+        with col7, section("amex/dividend_yield_chart"):
             st.header("Dividend Yield")
 
             # Use Plotly for the chart only
-            fig1 = go.Figure(
-                data=[
-                    go.Pie(
-                        values=[0.93, 100 - 0.93],
-                        hole=0.6,
-                        marker_colors=["#800020", "#F0F0F0"],
-                        textinfo="none",
-                        showlegend=False,
-                    )
-                ]
-            )
-
-            # Adjust layout to place text inside the chart
-            fig1.update_layout(
-                height=300,
-                margin=dict(t=0, b=0, l=0, r=0),
-                annotations=[
-                    dict(
-                        text="<b>0.93%</b>",
-                        x=0.5, y=0.5,
-                        font=dict(size=40, color="#800020"),
-                        showarrow=False
-                    ),
-                    dict(
-                        text="<br>Consistent returns",
-                        x=0.5, y=0.35,
-                        font=dict(size=12, color="gray"),
-                        showarrow=False,
-                    ),
-                ],
+            dividend_yield = store.value("amex", "dividend_yield", "2024")
+            fig1 = stat_donut_figure(
+                dividend_yield, 100, AMEX_WINE, f"{dividend_yield:g}%", "Consistent returns",
+                template="amex"
             )
 
-            st.plotly_chart(fig1, use_container_width=True)
+            plot_chart(fig1)
 
         # P/E Ratio Chart
-        with col8:
+        with col8, section("amex/pe_ratio_chart"):
             st.header("P/E Ratio")
 
             # Use Plotly for the chart only
-            fig2 = go.Figure(
-                data=[
-                    go.Pie(
-                        values=[22.98, 100 - 22.98],
-                        hole=0.6,
-                        marker_colors=["#800020", "#F0F0F0"],
-                        textinfo="none",
-                        showlegend=False,
-                    )
-                ]
+            pe_ratio = store.value("amex", "pe_ratio", "2024")
+            fig2 = stat_donut_figure(
+                pe_ratio, 100, AMEX_WINE, f"{pe_ratio:g}", "Healthy valuation",
+                template="amex"
             )
 
-            # Adjust layout to place text inside the chart
-            fig2.update_layout(
-                height=300,
-                margin=dict(t=0, b=0, l=0, r=0),
-                annotations=[
-                    dict(
-                        text="<b>22.98</b>",
-                        x=0.5, y=0.5,
-                        font=dict(size=40, color="#800020"),
-                        showarrow=False
-                    ),
-                    dict(
-                        text="<br>Healthy valuation",
-                        x=0.5, y=0.35,
-                        font=dict(size=12, color="gray"),
-                        showarrow=False,
-                    ),
-                ],
-            )
-
-            st.plotly_chart(fig2, use_container_width=True)
+            plot_chart(fig2)
 
 
 
 
     # Key Performance Indicators
-    st.markdown("### Key Performance Indicators")
-    kpi1, kpi2, kpi3 = st.columns(3)
-
-    with kpi1:
-        st.metric("Customer Retention", "92%")
-
-    with kpi2:
-        st.metric("Avg. Transaction Value", "$1,250")
-
-    with kpi3:
-        st.metric("Cross-Sell Rate", "1.5x")
+    transactions = transaction_cube()
+    has_transactions = transactions is not None and "amex" in transactions
+    with section("amex/kpi_cards"):
+        st.markdown("### Key Performance Indicators")
+        retention = store.value("amex", "customer_retention", "2024")
+        cross_sell = store.value("amex", "cross_sell_rate", "2024")
+        kpis = [("Customer Retention", f"{format_number(retention)}%")]
+        if not has_transactions:
+            # Otherwise the transaction panel shows it for the selected filters
+            transaction_value = store.value("amex", "avg_transaction_value", "2024")
+            kpis.append(("Avg. Transaction Value", format_money(transaction_value, "$")))
+        kpis.append(("Cross-Sell Rate", f"{format_number(cross_sell)}x"))
+        metric_cards(kpis)
 
     # Spending Trends
-    st.markdown("### Spending Trends")
-    generations = ["Gen Z", "Millennials", "Gen X", "Baby Boomers"]
-    spending = [16, 12, 7, 4]
-
-    fig = px.bar(x=generations, y=spending, color_discrete_sequence=[COLOR_BURGUNDY])
-    fig.update_layout(
-        title="Spending Growth by Generation (%)",
-        xaxis_title="Generation",
-        yaxis_title="Growth (%)",
-        height=300,
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    with section("amex/spending_chart"):
+        st.markdown("### Spending Trends")
+        if has_transactions:
+            # Filterable spend growth from transaction-level data
+            transaction_panel(
+                transactions,
+                "amex",
+                growth_by="generation",
+                colors=[AMEX_BURGUNDY],
+                title="Spending Growth by Generation (%)",
+                height=300,
+                template="amex",
+            )
+        else:
+            spending = store.frame(
+                "amex", {"spending_growth": "Growth"}, period="Generation"
+            )
+
+            fig = px_bar_figure(
+                spending,
+                "Generation",
+                "Growth",
+                colors=[AMEX_BURGUNDY],
+                title="Spending Growth by Generation (%)",
+                xaxis_title="Generation",
+                yaxis_title="Growth (%)",
+                height=300,
+                template="amex",
+            )
+            plot_chart(fig)
 
     # Footer
     st.markdown("---")
     st.markdown("*Data reflects strong performance across key metrics and segments*")
 
-# Overall footer
-st.markdown("---")
-st.markdown("### 📊 Dashboard Suite Summary")
-col_summary1, col_summary2, col_summary3 = st.columns(3)
+# ====================== COMPANY COMPARISON TAB ======================
+COMPANY_NAMES = {
+    "revolut": "Revolut",
+    "telda": "Telda",
+    "amex": "American Express",
+    "visa": "Visa",
+    "mastercard": "Mastercard",
+}
+METRIC_LABELS = {"roi": "ROI (%)", "arpu": "ARPU", "cac": "CAC", "ltv": "LTV"}
+
+
+def metric_label(metric):
+    return METRIC_LABELS.get(metric, metric.replace("_", " ").title())
+
 
-with col_summary1:
+def render_compare():
+    st.title("📊 Company Comparison")
     st.markdown(
-        """
-    **🏦 Revolut Youth**
-    - £188M Revenue (FY23)
-    - 2M Active Users
-    - 3,660% ROI Achievement
-    """
+        f"Monetary metrics are shown in **{REPORTING_CURRENCY}**, converted once when the data is loaded."
     )
+    st.markdown("---")
 
-with col_summary2:
-    st.markdown(
-        """
-    **🏛️ Telda**
-    - 500K Users by 2023
-    - $300M Transaction Volume
-    - 70% Youth Market Focus
-    """
+    store = current_store()
+
+    # Metrics with dated values for at least two companies
+    def dated(metric):
+        return [c for c in store.companies(metric) if store.rollups.levels(c, metric)]
+
+    metrics = sorted(
+        metric for metric in {metric for _, metric in store.index} if len(dated(metric)) > 1
     )
+    if not metrics:
+        error = compute_service().error(("rollups", str(store.data_dir)))
+        if error is not None:
+            st.error(f"Rollups could not be computed: {error}")
+        else:
+            st.info("Rollups are still being computed, the comparison will appear shortly.")
+        return
+
+    col_metric, col_companies, col_level = st.columns([1, 2, 1])
+    with col_metric:
+        metric = st.selectbox(
+            "Metric",
+            metrics,
+            format_func=metric_label,
+            key="compare_metric",
+        )
+    with col_companies:
+        companies = st.multiselect(
+            "Companies",
+            dated(metric),
+            default=dated(metric),
+            format_func=COMPANY_NAMES.get,
+            key="compare_companies",
+        )
+    if not companies:
+        st.info("Pick at least one company to compare.")
+        return
 
-with col_summary3:
-    st.markdown(
-        """
-    **💳 American Express**
-    - $75B Revenue (2024)
-    - 21% ROI vs Competitors
-    - 75% Millennial/Gen Z Growth
-    """
-    )
\ No newline at end of file
+    levels = [
+        level for level in LEVELS
+        if all(level in store.rollups.levels(company, metric) for company in companies)
+    ]
+    with col_level:
+        level = st.radio(
+            "Granularity",
+            levels,
+            index=levels.index("year") if "year" in levels else 0,
+            format_func=str.title,
+            horizontal=True,
+            key="compare_level",
+        )
+        log_scale = st.checkbox("Log scale", key="compare_log")
+
+    with section("compare/chart"):
+        data = store.compare(metric, companies, level)
+
+        # Show amounts in the largest unit that keeps them above one
+        peak = data[companies].abs().max().max()
+        unit = next((unit for unit in ("B", "M", "K") if peak >= UNIT_SCALES[unit]), "")
+        data[companies] = data[companies] / UNIT_SCALES[unit]
+        label = metric_label(metric)
+        if any(store.is_monetary(company, metric) for company in companies):
+            axis_unit = f" ({REPORTING_CURRENCY} {unit})".replace(" )", ")")
+        else:
+            axis_unit = f" ({unit})" if unit else ""
+
+        fig = multi_line_figure(
+            data,
+            "period",
+            companies,
+            names=[COMPANY_NAMES[company] for company in companies],
+            colors=[COMPANY_COLORS[company] for company in companies],
+            title=f"{label} by Company",
+            xaxis_title=level.title(),
+            yaxis_title=label + axis_unit,
+            yaxis_type="log" if log_scale else None,
+            height=450,
+        )
+        plot_chart(fig)
+
+    with section("compare/table"):
+        st.dataframe(
+            data.set_index("period").rename(columns=COMPANY_NAMES),
+            use_container_width=True,
+        )
+
+# ====================== TAB ROUTING ======================
+# Tabs are routed instead of drawn with st.tabs: st.tabs runs every tab body on
+# each rerun, so only the selected dashboard is rendered here. Dashboards
+# declared in dashboards/ (see specs.py) come after the ones written here.
+PLANS = dashboard_plans()
+DASHBOARDS = {
+    "revolut": ("🏦 Revolut Youth", render_revolut),
+    "amex": ("💳 American Express", render_amex),
+    **{key: (plan.label, plan.render) for key, plan in PLANS.items()},
+    "compare": ("📊 Compare", render_compare),
+}
+
+# Keep the selected tab in the URL (?tab=telda) so links open the right dashboard
+if "dashboard" not in st.session_state:
+    tab = st.query_params.get("tab")
+    st.session_state.dashboard = tab if tab in DASHBOARDS else "revolut"
+
+selected_tab = st.radio(
+    "Dashboard",
+    list(DASHBOARDS),
+    format_func=lambda key: DASHBOARDS[key][0],
+    horizontal=True,
+    label_visibility="collapsed",
+    key="dashboard",
+)
+st.query_params["tab"] = selected_tab
+
+# Live mode polls the local feed in a fragment; the rest of the page stays put
+st.sidebar.toggle("Live mode", key="live", help="Stream transaction and user counts from the local feed")
+
+with section(selected_tab):
+    DASHBOARDS[selected_tab][1]()
+
+if compute_service().busy():
+    with st.sidebar:
+        refreshing_badge()
+
+# Overall footer
+st.markdown("---")
+with section("summary_footer"):
+    st.markdown("### 📊 Dashboard Suite Summary")
+    store = current_store()
+    revolut = company_kpis(store, "revolut", ("revenue", "users", "phase_revenue", "phase_investment"))
+    amex = company_kpis(store, "amex", ("revenue", "roi"))
+    young_share = store.value("amex", "acquisition_mix", "Gen Z/Millennials")
+    summaries = [
+        (
+            "🏦 Revolut Youth",
+            [
+                f"{format_money(revolut.latest('revenue'), '£', 'M')} Revenue ({revolut.period('revenue')})",
+                f"{format_number(revolut.latest('users'))}M Active Users",
+                f"{format_percent(revolut.roi('phase_revenue', 'phase_investment'), decimals=0)} ROI Achievement",
+            ],
+        ),
+        (
+            "💳 American Express",
+            [
+                f"{format_money(amex.latest('revenue'), '$', 'B')} Revenue ({amex.period('revenue')})",
+                f"{format_number(amex.latest('roi'))}% ROI vs Competitors",
+                f"{format_number(young_share, decimals=0)}% Millennial/Gen Z Growth",
+            ],
+        ),
+    ]
+    summaries += [
+        (plan.summary[0], plan.summary_points(store)) for plan in PLANS.values() if plan.summary
+    ]
+    for col, (title, points) in zip(st.columns(len(summaries)), summaries):
+        with col:
+            st.markdown("\n".join([f"**{title}**"] + [f"- {point}" for point in points]))
+
+# Pick up data files changed since this run; the scheduler reloads them in the
+# background and this only compares version keys
+rerun_on_refresh(refresh_scheduler().versions())
+
+# Section timings, shown with ?debug=1
+debug_panel()
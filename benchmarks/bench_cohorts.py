@@ -0,0 +1,40 @@
+"""Time the vectorized cohort unit-economics at 1M and 10M customers.
+
+Run from the repository root:
+
+    python benchmarks/bench_cohorts.py [n_customers ...]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cohorts import ltv_curves, simulate, unit_economics  # noqa: E402
+
+SIZES = [1_000_000, 10_000_000]
+COHORTS = [f"Phase {i}" for i in range(1, 5)] + [f"Q{q} 2023" for q in range(1, 5)]
+
+
+def timed(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'customers':>11} {'ltv_curves s':>13} {'unit_economics s':>17} {'ns/customer':>12}")
+    for n in sizes:
+        spend, customers = simulate(n, COHORTS, horizon=36)
+        curves = timed(ltv_curves, customers)
+        total = timed(unit_economics, spend, customers)
+        print(f"{n:>11,} {curves:>13.3f} {total:>17.3f} {total / n * 1e9:>12.1f}")
+        del spend, customers
+
+
+if __name__ == "__main__":
+    main()
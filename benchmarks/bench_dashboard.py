@@ -0,0 +1,182 @@
+"""Drive Dashboard.py headlessly and report rerun latency, memory and payload.
+
+Run from the repository root:
+
+    python benchmarks/bench_dashboard.py [--sessions 8] [--reruns 10] [--json out.json]
+
+Scenarios, each run through streamlit.testing.v1.AppTest:
+
+    cold start   first run of a fresh session with the st.cache_* caches cleared
+    warm rerun   reruns of a session that has already rendered its tab
+    tab switch   selecting each dashboard in turn from the tab radio
+    concurrent   N sessions rerunning at the same time, one thread each
+
+For every scenario it prints p50/p95 rerun latency and the total figure
+payload (Plotly JSON bytes sent to the browser) per rerun. Peak RSS of the
+whole process is printed at the end.
+"""
+import argparse
+import json
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+APP = str(ROOT / "Dashboard.py")
+TABS = ("revolut", "telda", "amex")
+TIMEOUT = 120
+
+
+def session(tab="revolut"):
+    at = AppTest.from_file(APP, default_timeout=TIMEOUT)
+    at.query_params["tab"] = tab
+    return at
+
+
+def timed_run(at, action=None):
+    """Run the script once; (seconds, figure payload bytes)."""
+    start = time.perf_counter()
+    (action() if action else at).run()
+    seconds = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    payload = sum(len(chart.proto.spec) for chart in at.get("plotly_chart"))
+    return seconds, payload
+
+
+def cold_start(runs):
+    samples = []
+    for index in range(runs):
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        samples.append(timed_run(session(TABS[index % len(TABS)])))
+    return samples
+
+
+def warm_rerun(reruns):
+    samples = []
+    for tab in TABS:
+        at = session(tab)
+        at.run()
+        samples += [timed_run(at) for _ in range(reruns)]
+    return samples
+
+
+def tab_switch(reruns):
+    at = session()
+    at.run()
+    samples = []
+    for index in range(reruns * len(TABS)):
+        tab = TABS[(index + 1) % len(TABS)]
+        samples.append(timed_run(at, lambda: at.radio(key="dashboard").set_value(tab)))
+    return samples
+
+
+@contextmanager
+def shared_runtime():
+    """Let AppTest sessions run from several threads at once.
+
+    Each AppTest run installs its own mock Runtime singleton and clears it when
+    it finishes, which breaks any session still running in another thread.
+    Pin one runtime for the duration and let AppTest assign to a subclass.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    with patch("streamlit.testing.v1.app_test.Runtime", type("PinnedRuntime", (Runtime,), {})):
+        yield
+    Runtime._instance = None
+
+
+def concurrent(sessions, reruns):
+    apps = [session(TABS[index % len(TABS)]) for index in range(sessions)]
+    for at in apps:
+        at.run()
+    samples, errors, lock = [], [], threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def viewer(at):
+        barrier.wait()
+        try:
+            for _ in range(reruns):
+                sample = timed_run(at)
+                with lock:
+                    samples.append(sample)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=viewer, args=(at,)) for at in apps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return samples
+
+
+def summarize(name, samples):
+    seconds = np.array([sample[0] for sample in samples]) * 1000
+    payload = np.array([sample[1] for sample in samples])
+    return {
+        "scenario": name,
+        "runs": len(samples),
+        "p50_ms": round(float(np.percentile(seconds, 50)), 1),
+        "p95_ms": round(float(np.percentile(seconds, 95)), 1),
+        "payload_kb": round(float(payload.mean()) / 1024, 1),
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns per session")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args()
+
+    results = [
+        summarize("cold start", cold_start(len(TABS))),
+        summarize("warm rerun", warm_rerun(args.reruns)),
+        summarize("tab switch", tab_switch(args.reruns)),
+    ]
+    with shared_runtime():
+        results.append(
+            summarize(f"concurrent x{args.sessions}", concurrent(args.sessions, args.reruns))
+        )
+
+    print(f"{'scenario':<16} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8} {'payload KB':>11}")
+    for row in results:
+        print(
+            f"{row['scenario']:<16} {row['runs']:>5} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['payload_kb']:>11.1f}"
+        )
+    rss = peak_rss_mb()
+    print(f"peak RSS: {rss:.0f} MB")
+
+    if args.json:
+        args.json.write_text(json.dumps({"results": results, "peak_rss_mb": round(rss, 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Profile the dashboard's startup imports and guard time to first paint.
+
+Run from the repository root:
+
+    python benchmarks/bench_imports.py [--runs 5] [--top 15] [--budget-ms 3000]
+
+Each run starts a fresh interpreter twice:
+
+    imports      python -X importtime importing what Dashboard.py imports at
+                 the top; prints the total and the slowest modules
+    first paint  time from launching a new process to the end of its first
+                 AppTest render of the default tab
+
+The run fails (exit status 1) when the median first paint exceeds
+--budget-ms, or when a module in DEFERRED was loaded by the first paint.
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "Dashboard.py"
+
+# Heavy modules the default tab must not need
+DEFERRED = ("plotly.express", "pyarrow.parquet")
+
+# Writes when the render finished to argv[1] and exits without waiting for
+# the compute pool (whose processes would also hold on to an output pipe)
+FIRST_PAINT = f"""
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+if __name__ == "__main__":
+    at = AppTest.from_file({str(APP)!r}, default_timeout=120)
+    at.run()
+    if at.exception:
+        sys.exit(at.exception[0].message)
+    loaded = [name for name in {DEFERRED!r} if name in sys.modules]
+    with open(sys.argv[1], "w") as out:
+        json.dump([time.time(), loaded], out)
+    os._exit(0)
+"""
+
+
+def app_imports():
+    """Top-level modules Dashboard.py imports, in order."""
+    names = []
+    for node in ast.parse(APP.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names.append(node.module)
+    return names
+
+
+def import_profile(modules):
+    """(total µs, {module: (self µs, cumulative µs)}) from one -X importtime run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total, times = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+        # Top-level imports are indented by a single space
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, times
+
+
+def first_paint():
+    """(seconds, deferred modules loaded) for one fresh-process render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "paint.json"
+        start = time.time()
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_PAINT, str(out)], cwd=ROOT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        if result.returncode or not out.exists():
+            raise RuntimeError("First paint failed; run the app to see the error")
+        painted, loaded = json.loads(out.read_text())
+    return painted - start, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=3000, help="first paint budget")
+    args = parser.parse_args()
+
+    modules = app_imports()
+    profiles = [import_profile(modules) for _ in range(args.runs)]
+    paints = [first_paint() for _ in range(args.runs)]
+
+    totals = [total for total, _ in profiles]
+    print(f"imports      median {statistics.median(totals) / 1000:8.1f} ms"
+          f"   ({', '.join(modules)})")
+    times = profiles[-1][1]
+    print(f"\n{'module':<48} {'self ms':>8} {'cumul. ms':>10}")
+    for name, (own, cumulative) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:<48} {own / 1000:>8.1f} {cumulative / 1000:>10.1f}")
+
+    paint = statistics.median(seconds for seconds, _ in paints) * 1000
+    loaded = sorted({name for _, names in paints for name in names})
+    print(f"\nfirst paint  median {paint:8.1f} ms   budget {args.budget_ms:.0f} ms")
+
+    failures = []
+    if paint > args.budget_ms:
+        failures.append(f"first paint {paint:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"loaded at startup but should be deferred: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure how process memory grows with the number of open sessions.
+
+Run from the repository root:
+
+    python benchmarks/bench_memory.py [--sessions 1 50 200] [--tab revolut]
+
+Opens AppTest sessions one after another and keeps every one of them alive,
+like browser tabs left open on the server. After 1, 50 and 200 sessions (or
+the counts given) it prints the RSS of the process and the growth per session
+since the first one. The store table, figures and other shared data are
+loaded by the first session; what later sessions add is their own state plus
+the element tree AppTest keeps for each of them.
+
+Linux only: RSS is read from /proc/self/status.
+"""
+import argparse
+import gc
+import sys
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+APP = str(ROOT / "Dashboard.py")
+
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmRSS not found in /proc/self/status")
+
+
+def open_session(tab):
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.query_params["tab"] = tab
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 50, 200])
+    parser.add_argument("--tab", default="revolut")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'RSS MB':>8} {'KB/session':>11}")
+    sessions, first = [], None
+    for count in sorted(args.sessions):
+        while len(sessions) < count:
+            sessions.append(open_session(args.tab))
+        gc.collect()
+        rss = rss_mb()
+        if first is None:
+            first = (count, rss)
+            per_session = "-"
+        else:
+            per_session = f"{(rss - first[1]) * 1024 / (count - first[0]):.0f}"
+        print(f"{count:>8} {rss:>8.1f} {per_session:>11}")
+
+
+if __name__ == "__main__":
+    main()
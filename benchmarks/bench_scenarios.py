@@ -0,0 +1,47 @@
+"""Time building the phase scenario cube against one slider lookup.
+
+Run from the repository root:
+
+    python benchmarks/bench_scenarios.py [--moves 1000]
+
+Building evaluates the ROI model at every grid point once (done once per data
+version); a slider move only interpolates the cube at one point.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_store import load_store  # noqa: E402
+from scenarios import CAC_GRID, CHURN_GRID, INVESTMENT_GRID, ScenarioCube  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--moves", type=int, default=1000, help="random slider positions")
+    args = parser.parse_args()
+
+    store = load_store()
+    start = time.perf_counter()
+    cube = ScenarioCube.from_store(store)
+    build = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    points = zip(*(rng.choice(grid, args.moves) for grid in (INVESTMENT_GRID, CAC_GRID, CHURN_GRID)))
+    start = time.perf_counter()
+    for point in points:
+        cube.at(*point)
+        cube.payback_at(*point)
+    move = (time.perf_counter() - start) / args.moves
+
+    print(f"grid points     {cube.roi[..., 0].size:>10,}")
+    print(f"build           {build * 1000:>10.2f} ms")
+    print(f"slider move     {move * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
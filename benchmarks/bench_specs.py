@@ -0,0 +1,96 @@
+"""Check that declared dashboards do not add to the rerun cost of other tabs.
+
+Run from the repository root:
+
+    python benchmarks/bench_specs.py [--brands 1 10] [--reruns 15]
+
+For each count, a temporary DASHBOARD_SPECS_DIR gets that many copies of
+dashboards/telda.json under different keys, and a fresh process renders the
+first declared tab and the Revolut tab with AppTest. It prints the time to
+compile the specs and the median warm rerun of both tabs. With the plans
+cached, ten brands should rerun as fast as one.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SPEC = ROOT / "dashboards" / "telda.json"
+
+# Writes its timings to argv[1] and exits without waiting for the compute pool
+# (whose processes would also hold on to an output pipe)
+RERUNS = f"""
+import json, os, statistics, sys, time
+sys.path.insert(0, {str(ROOT)!r})
+from streamlit.testing.v1 import AppTest
+from compute import compute_service
+import specs
+
+def reruns(tab, count):
+    at = AppTest.from_file({str(ROOT / "Dashboard.py")!r}, default_timeout=120)
+    at.query_params["tab"] = tab
+    at.run()
+    compute_service().wait()
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+        if at.exception:
+            sys.exit(at.exception[0].message)
+    return statistics.median(samples) * 1000
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    plans = specs.compiled_plans.__wrapped__(specs.SPECS_DIR, specs.specs_version())
+    compile_ms = (time.perf_counter() - start) * 1000
+    count = int(sys.argv[2])
+    result = [compile_ms, reruns(next(iter(plans)), count), reruns("revolut", count)]
+    with open(sys.argv[1], "w") as out:
+        json.dump(result, out)
+    os._exit(0)
+"""
+
+
+def write_specs(directory, brands):
+    spec = json.loads(SPEC.read_text(encoding="utf-8"))
+    for index in range(brands):
+        key = f"{spec['key']}{index or ''}"
+        copy = dict(spec, key=key, label=f"{spec['label']} {index + 1}")
+        (directory / f"{key}.json").write_text(json.dumps(copy), encoding="utf-8")
+
+
+def measure(brands, reruns):
+    with tempfile.TemporaryDirectory() as tmp:
+        specs_dir = Path(tmp) / "dashboards"
+        specs_dir.mkdir()
+        write_specs(specs_dir, brands)
+        out = Path(tmp) / "result.json"
+        result = subprocess.run(
+            [sys.executable, "-c", RERUNS, str(out), str(reruns)],
+            cwd=ROOT, env=dict(os.environ, DASHBOARD_SPECS_DIR=str(specs_dir)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        if result.returncode or not out.exists():
+            raise RuntimeError(f"Run with {brands} brands failed; run the app to see the error")
+        return json.loads(out.read_text())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--brands", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--reruns", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'brands':>6} {'compile ms':>11} {'spec tab ms':>12} {'revolut ms':>11}")
+    for brands in args.brands:
+        compile_ms, spec_tab, revolut = measure(brands, args.reruns)
+        print(f"{brands:>6} {compile_ms:>11.1f} {spec_tab:>12.1f} {revolut:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Measure the figure JSON saved by the lean brand templates.
+
+Run from the repository root:
+
+    python benchmarks/bench_templates.py
+
+Renders each dashboard with AppTest and sums the Plotly spec bytes Streamlit
+sends for its charts. The "default template" column re-serializes the same
+specs with Streamlit's default Plotly template inlined instead, which is what
+every figure carried before the brand templates (the ARPU chart carried the
+larger plotly_white). Gzip sizes approximate the compressed websocket payload.
+"""
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import plotly.io as pio
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+APP = str(ROOT / "Dashboard.py")
+TABS = ("revolut", "telda", "amex")
+
+
+def compact(spec):
+    return json.dumps(spec, separators=(",", ":")).encode()
+
+
+def chart_specs(tab):
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.query_params["tab"] = tab
+    at.run()
+    return [json.loads(chart.proto.spec) for chart in at.get("plotly_chart")]
+
+
+def with_template(spec, template):
+    return {**spec, "layout": {**spec["layout"], "template": template}}
+
+
+def main():
+    default = pio.templates[pio.templates.default].to_plotly_json()
+    print(f"{'tab':<9} {'charts':>6} {'default KB':>11} {'brand KB':>9} {'saved':>6} "
+          f"{'default gz KB':>14} {'brand gz KB':>12}")
+    totals = [0, 0, 0, 0, 0]
+    for tab in TABS:
+        specs = chart_specs(tab)
+        brand = b"".join(compact(spec) for spec in specs)
+        before = b"".join(compact(with_template(spec, default)) for spec in specs)
+        row = [len(specs), len(before), len(brand), len(gzip.compress(before)), len(gzip.compress(brand))]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{tab:<9} {row[0]:>6} {row[1] / 1024:>11.1f} {row[2] / 1024:>9.1f} "
+              f"{1 - row[2] / row[1]:>6.0%} {row[3] / 1024:>14.1f} {row[4] / 1024:>12.1f}")
+    print(f"{'total':<9} {totals[0]:>6} {totals[1] / 1024:>11.1f} {totals[2] / 1024:>9.1f} "
+          f"{1 - totals[2] / totals[1]:>6.0%} {totals[3] / 1024:>14.1f} {totals[4] / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Time the transaction cube build and filtered queries at scale.
+
+Run from the repository root:
+
+    python benchmarks/bench_transactions.py [--rows 10000000] [--dir PATH] [--queries 200]
+
+Writes ``--rows`` synthetic transactions to a temporary directory (or uses
+the Parquet files already in ``--dir``), builds the cube the dashboards query
+and times random filter combinations: date range, card types, generations
+and age bands, each answered as totals plus a growth-by-generation breakdown.
+Use --rows 100000000 for the 100M-row case (about 2 GB of Parquet).
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from transactions import DIMENSIONS, build_cube, write_demo  # noqa: E402
+
+
+def random_query(cube, company, rng):
+    first, last = (pd.Timestamp(day) for day in cube.date_range(company))
+    days = (last - first).days
+    start = first + pd.Timedelta(days=int(rng.integers(0, days // 2)))
+    end = start + pd.Timedelta(days=int(rng.integers(30, days // 2)))
+    filters = {}
+    for name in DIMENSIONS:
+        options = cube.options(company, name)
+        if rng.random() < 0.5:
+            filters[name] = list(rng.choice(options, rng.integers(1, len(options) + 1), replace=False))
+    return start, end, filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--dir", type=Path, help="existing transaction files to use")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.dir
+        if directory is None:
+            directory = Path(tmp)
+            start = time.perf_counter()
+            write_demo(directory, args.rows)
+            print(f"generate   {args.rows:>12,} rows {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        cube = build_cube(directory)
+        print(f"build cube {len(cube.count):>12,} cells {time.perf_counter() - start:7.2f} s")
+
+    rng = np.random.default_rng(0)
+    timings = []
+    for _ in range(args.queries):
+        company = "amex" if rng.random() < 0.5 else "telda"
+        query = random_query(cube, company, rng)
+        start = time.perf_counter()
+        cube.totals(company, *query)
+        cube.growth(company, "generation", *query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"query      p50 {statistics.median(timings):.2f} ms   "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms   "
+          f"max {timings[-1]:.2f} ms   ({args.queries} filtered totals + growth)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare SVG and WebGL line traces by payload size and render time.
+
+Run from the repository root:
+
+    python benchmarks/bench_webgl.py
+
+Prints the figure JSON size and the server-side build + serialize time for
+each trace size, and writes benchmarks/out/webgl_render.html. Open that page
+in a browser to time Plotly.newPlot for the same figures on the client.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from figures import line_figure  # noqa: E402
+
+SIZES = [1_000, 10_000, 50_000, 200_000]
+OUT_DIR = Path(__file__).parent / "out"
+
+
+def series(n):
+    rng = np.random.default_rng(n)
+    return pd.DataFrame({"x": np.arange(n), "y": np.cumsum(rng.standard_normal(n))})
+
+
+def build(data, render_mode):
+    # Bypass the figure cache so every run pays for construction
+    start = time.perf_counter()
+    fig = line_figure.__wrapped__(data, "x", "y", color="#667eea", render_mode=render_mode)
+    spec = pio.to_json(fig, validate=False)
+    return spec, time.perf_counter() - start
+
+
+def main():
+    build(series(100), "svg")  # warm up plotly's validators
+    specs = {}
+    print(f"{'points':>8} {'mode':>6} {'payload KB':>11} {'build+json ms':>14}")
+    for n in SIZES:
+        data = series(n)
+        for mode in ("svg", "webgl"):
+            spec, seconds = build(data, mode)
+            specs[f"{mode}-{n}"] = json.loads(spec)
+            print(f"{n:>8} {mode:>6} {len(spec) / 1024:>11.1f} {seconds * 1000:>14.1f}")
+
+    # Client-side half: one div per figure, timed with Plotly.newPlot
+    OUT_DIR.mkdir(exist_ok=True)
+    page = OUT_DIR / "webgl_render.html"
+    page.write_text(
+        "<html><body><pre id='results'>rendering...</pre>"
+        f"<script>{get_plotlyjs()}</script>"
+        f"<script>const specs = {json.dumps(specs)};"
+        """
+const lines = [];
+(async () => {
+  for (const [name, spec] of Object.entries(specs)) {
+    const div = document.createElement('div');
+    document.body.appendChild(div);
+    const start = performance.now();
+    await Plotly.newPlot(div, spec.data, spec.layout);
+    lines.push(name.padEnd(14) + (performance.now() - start).toFixed(1) + ' ms');
+    Plotly.purge(div);
+    div.remove();
+  }
+  document.getElementById('results').textContent = lines.join('\\n');
+})();
+</script></body></html>"""
+    )
+    print(f"\nBrowser render timings: open {page}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare the JSON and binary figure wire formats by payload size and decode time.
+
+Run from the repository root:
+
+    python benchmarks/bench_wire.py [--points 10000 100000] [--threshold 100]
+
+Every chart of the Revolut, Telda and Amex tabs is rendered headlessly once
+per format (see wire.py), plus an hourly line chart of each --points size for
+the long series the tabs do not have yet. For each chart it prints the figure
+JSON Streamlit sends and the time to decode it in Python (json.loads, then
+every typed array to numpy). It also writes benchmarks/out/wire_decode.html;
+open that page in a browser to time JSON.parse + Plotly.newPlot of the same
+payloads on the client.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import wire  # noqa: E402
+
+TABS = ("revolut", "telda", "amex")
+OUT_DIR = Path(__file__).parent / "out"
+
+
+def tab_payloads(tab, wire_format):
+    """[(chart title, figure JSON)] of ``tab`` rendered in ``wire_format``."""
+    from snapshot import run_tab
+
+    wire.WIRE_FORMAT = wire_format
+    charts = run_tab(tab).get("plotly_chart")
+    payloads = []
+    for index, chart in enumerate(charts, 1):
+        title = json.loads(chart.proto.spec).get("layout", {}).get("title", {}).get("text")
+        payloads.append((title or f"chart {index}", chart.proto.spec))
+    return payloads
+
+
+def series_payloads(points, wire_format):
+    from figures import line_figure
+
+    rng = np.random.default_rng(points)
+    data = pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=points, freq="h"),
+            "Revenue": np.round(100 + np.cumsum(rng.standard_normal(points)), 2),
+        }
+    )
+    # Bypass the figure cache; every point is sent, none downsampled
+    fig = line_figure.__wrapped__(data, "Date", "Revenue", color="#667eea")
+    return [(f"{points:,} hourly points", pio.to_json(wire.wire_figure(fig, wire_format), validate=False))]
+
+
+def decode_all(value):
+    if isinstance(value, dict):
+        if "bdata" in value:
+            return wire.decode(value)
+        return {key: decode_all(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_all(item) for item in value]
+    return value
+
+
+def decode_ms(payload, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_all(json.loads(payload))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def write_page(rows):
+    OUT_DIR.mkdir(exist_ok=True)
+    page = OUT_DIR / "wire_decode.html"
+    payloads = {f"{group}/{title}": formats for group, title, formats in rows}
+    page.write_text(
+        "<html><body><pre id='results'>rendering...</pre>"
+        f"<script>{get_plotlyjs()}</script>"
+        f"<script>const payloads = {json.dumps(payloads)};"
+        """
+const lines = [];
+(async () => {
+  for (const [name, formats] of Object.entries(payloads)) {
+    const cells = [];
+    for (const [format, payload] of Object.entries(formats)) {
+      const div = document.createElement('div');
+      document.body.appendChild(div);
+      const start = performance.now();
+      const spec = JSON.parse(payload);
+      await Plotly.newPlot(div, spec.data, spec.layout);
+      cells.push(format + ' ' + (performance.now() - start).toFixed(1) + ' ms');
+      Plotly.purge(div);
+      div.remove();
+    }
+    lines.push(name.slice(0, 50).padEnd(52) + cells.join('   '));
+  }
+  document.getElementById('results').textContent = lines.join('\\n');
+})();
+</script></body></html>"""
+    )
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="*", default=[10_000, 100_000])
+    parser.add_argument("--threshold", type=int, default=wire.BINARY_THRESHOLD)
+    args = parser.parse_args()
+    wire.BINARY_THRESHOLD = args.threshold
+
+    groups = [(tab, lambda fmt, tab=tab: tab_payloads(tab, fmt)) for tab in TABS]
+    groups += [("series", lambda fmt, n=n: series_payloads(n, fmt)) for n in args.points]
+    rows = []
+    for group, payloads in groups:
+        json_path, binary = payloads("json"), payloads("binary")
+        for (title, json_spec), (_, binary_spec) in zip(json_path, binary):
+            rows.append((group, title, {"json": json_spec, "binary": binary_spec}))
+
+    print(f"{'chart':<50} {'json KB':>9} {'binary KB':>10} {'json ms':>8} {'binary ms':>10}")
+    totals = {}
+    for group, title, formats in rows:
+        sizes = [len(formats[fmt]) / 1024 for fmt in ("json", "binary")]
+        times = [decode_ms(formats[fmt]) for fmt in ("json", "binary")]
+        print(f"{group + '/' + title:<50.50} {sizes[0]:>9.1f} {sizes[1]:>10.1f} {times[0]:>8.2f} {times[1]:>10.2f}")
+        total = totals.setdefault(group, [0.0, 0.0, 0.0, 0.0])
+        for index, value in enumerate(sizes + times):
+            total[index] += value
+    print()
+    for group, (json_kb, binary_kb, json_ms, binary_ms) in totals.items():
+        print(f"{group + ' total':<50} {json_kb:>9.1f} {binary_kb:>10.1f} {json_ms:>8.2f} {binary_ms:>10.2f}")
+
+    page = write_page(rows)
+    print(f"\nBrowser decode timings: open {page}")
+    sys.stdout.flush()
+    os._exit(0)  # without waiting for the app's compute pool
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import html
+
+import streamlit as st
+
+# Card rows rendered as a single element.
+#
+# A row of KPI or phase cards used to be one st.columns block with an
+# st.markdown (or st.metric) call per card, i.e. a column element plus a
+# markdown element per card on every rerun, with values interpolated into the
+# HTML as-is. The functions here take the cards as plain data, escape every
+# value, and send the whole row as one st.markdown laid out with a CSS grid.
+# The .metric-card and .phase-card styles come from the page CSS in
+# Dashboard.py.
+
+GOOD = "#38a169"
+BAD = "#dc3545"
+
+
+def card_grid(cards, columns=None):
+    """Render already-built card HTML strings as one grid row."""
+    columns = columns or len(cards)
+    st.markdown(
+        f'<div style="display: grid; grid-template-columns: repeat({columns}, minmax(0, 1fr)); '
+        f'gap: 1rem;">{"".join(cards)}</div>',
+        unsafe_allow_html=True,
+    )
+
+
+def metric_card(label, value, delta=None, color=GOOD):
+    """HTML of one KPI card; every argument is escaped."""
+    delta_html = ""
+    if delta:
+        delta_html = (
+            f'<div style="color: {html.escape(color)}; font-weight: 500; font-size: 0.9rem;">'
+            f"{html.escape(str(delta))}</div>"
+        )
+    return (
+        '<div class="metric-card">'
+        f'<div class="metric-label">{html.escape(str(label))}</div>'
+        f'<div class="metric-value">{html.escape(str(value))}</div>'
+        f"{delta_html}</div>"
+    )
+
+
+def metric_cards(cards, columns=None):
+    """One row of KPI cards from (label, value[, delta]) tuples."""
+    card_grid([metric_card(*card) for card in cards], columns)
+
+
+def phase_card(title, description, rows, headline, color):
+    """HTML of one phase card: ``rows`` of (label, value), then a colored headline."""
+    lines = "".join(
+        '<div style="font-size: 0.9rem; margin: 0.3rem 0;">'
+        f"<strong>{html.escape(label)}:</strong> {html.escape(str(value))}</div>"
+        for label, value in rows
+    )
+    return (
+        '<div class="phase-card">'
+        f'<h4 style="color: #667eea; margin: 0 0 0.5rem 0;">{html.escape(title)}</h4>'
+        f'<p style="color: #6c757d; font-size: 0.85rem; margin: 0 0 1rem 0;">{html.escape(description)}</p>'
+        f'<div style="margin: 1rem 0;">{lines}'
+        f'<div style="font-size: 1.2rem; font-weight: bold; color: {html.escape(color)}; margin: 0.5rem 0;">'
+        f"{html.escape(headline)}</div></div></div>"
+    )
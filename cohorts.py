@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from data_store import DATA_DIR
+
+# Cohort unit economics computed from raw acquisition tables.
+#
+# Two tables live in data/cohorts/ (CSV or Parquet):
+#   spend      company, cohort, spend          acquisition spend per cohort
+#   customers  company, cohort, lifetime, revenue
+#              one row per customer: periods active before churning and the
+#              revenue earned in each active period
+#
+# Everything is computed with groupby, bincount and cumsum over whole columns,
+# so the cost grows with the number of customers, not with Python loops.
+
+COHORTS_DIR = DATA_DIR / "cohorts"
+
+
+def read_frame(directory, name):
+    """``name``.parquet or ``name``.csv from ``directory``, or None."""
+    for suffix, reader in ((".parquet", pd.read_parquet), (".csv", pd.read_csv)):
+        path = directory / f"{name}{suffix}"
+        if path.exists():
+            return reader(path)
+    return None
+
+
+def cohort_sizes(customers):
+    """Number of customers acquired per cohort."""
+    return customers.groupby("cohort", sort=False, observed=True).size()
+
+
+def cac(spend, customers):
+    """Customer acquisition cost per cohort."""
+    spend = spend.groupby("cohort", sort=False, observed=True)["spend"].sum()
+    return spend / cohort_sizes(customers).reindex(spend.index)
+
+
+def ltv_curves(customers, horizon=None):
+    """Cumulative revenue per acquired customer, one row per cohort.
+
+    Column ``t`` is the lifetime value after ``t + 1`` periods. A customer
+    with lifetime L earns its per-period revenue in periods 0 .. L - 1.
+    """
+    codes, cohorts = pd.factorize(customers["cohort"], sort=False)
+    lifetime = customers["lifetime"].to_numpy(dtype=np.int64)
+    if horizon is None:
+        horizon = int(lifetime.max()) if len(lifetime) else 0
+    lifetime = np.clip(lifetime, 0, horizon)
+
+    # Revenue of all customers churning after exactly L periods, per cohort
+    churned = np.bincount(
+        codes * (horizon + 1) + lifetime,
+        weights=customers["revenue"].to_numpy(dtype=np.float64),
+        minlength=len(cohorts) * (horizon + 1),
+    ).reshape(len(cohorts), horizon + 1)
+
+    # Period t earns from every customer with L > t; cumulate over periods
+    active = churned[:, ::-1].cumsum(axis=1)[:, ::-1][:, 1:]
+    sizes = np.bincount(codes, minlength=len(cohorts))
+    curves = active.cumsum(axis=1) / np.maximum(sizes, 1)[:, None]
+    return pd.DataFrame(curves, index=pd.Index(cohorts, name="cohort"))
+
+
+def payback_periods(cac_values, curves):
+    """Periods until the LTV curve covers CAC; NaN if it never does."""
+    covered = curves.to_numpy() >= cac_values.reindex(curves.index).to_numpy()[:, None]
+    periods = covered.argmax(axis=1) + 1.0
+    periods[~covered.any(axis=1)] = np.nan
+    return pd.Series(periods, index=curves.index)
+
+
+def unit_economics(spend, customers, horizon=None):
+    """CAC, LTV, payback and ROI per cohort, in cohort order of ``spend``.
+
+    ``cumulative_roi`` is the return on all spend up to and including each
+    cohort, which is what the "Cumulative ROI & Payback" chart plots.
+    """
+    cohort_cac = cac(spend, customers)
+    curves = ltv_curves(customers, horizon).reindex(cohort_cac.index)
+    sizes = cohort_sizes(customers).reindex(cohort_cac.index)
+    cohort_spend = spend.groupby("cohort", sort=False, observed=True)["spend"].sum()
+
+    ltv = curves.iloc[:, -1]
+    revenue = ltv * sizes
+    return pd.DataFrame(
+        {
+            "customers": sizes,
+            "spend": cohort_spend,
+            "cac": cohort_cac,
+            "ltv": ltv,
+            "payback": payback_periods(cohort_cac, curves),
+            "roi": revenue / cohort_spend - 1,
+            "cumulative_roi": revenue.cumsum() / cohort_spend.cumsum() - 1,
+        }
+    )
+
+
+def read_cohort_tables(directory=COHORTS_DIR):
+    """(spend, customers) tables, or None when no cohort data is present."""
+    if not directory.is_dir():
+        return None
+    spend, customers = read_frame(directory, "spend"), read_frame(directory, "customers")
+    if spend is None or customers is None:
+        return None
+    return spend, customers
+
+
+def cohort_files(directory=COHORTS_DIR):
+    """The cohort table files, watched by the refresh scheduler."""
+    return sorted(directory.iterdir()) if directory.is_dir() else []
+
+
+def company_unit_economics(company, directory=COHORTS_DIR):
+    """Per-cohort unit economics for ``company``, or None without cohort data.
+
+    Runs in the compute pool (see compute.cohort_economics), which keeps the
+    result until the cohort tables change.
+    """
+    tables = read_cohort_tables(directory)
+    if tables is None:
+        return None
+    spend, customers = (table[table["company"] == company] for table in tables)
+    if spend.empty or customers.empty:
+        return None
+    return unit_economics(spend, customers)
+
+
+def simulate(n_customers, cohorts, horizon=24, seed=0, company="revolut"):
+    """Synthetic spend and customer tables for benchmarks."""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, len(cohorts), n_customers)
+    customers = pd.DataFrame(
+        {
+            "company": company,
+            "cohort": pd.Categorical.from_codes(codes, categories=cohorts),
+            "lifetime": np.minimum(rng.geometric(0.08, n_customers), horizon),
+            "revenue": rng.gamma(2.0, 4.0, n_customers),
+        }
+    )
+    spend = pd.DataFrame(
+        {
+            "company": company,
+            "cohort": cohorts,
+            "spend": np.bincount(codes, minlength=len(cohorts)) * rng.uniform(10, 40, len(cohorts)),
+        }
+    )
+    return spend, customers
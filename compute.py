@@ -0,0 +1,263 @@
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+import streamlit as st
+
+from cohorts import COHORTS_DIR, cohort_files, company_unit_economics
+from data_store import DATA_DIR, build_rollups, load_store
+from refresh import refresh_scheduler
+from transactions import TRANSACTIONS_DIR, build_cube, transaction_files
+
+# Background compute service for the heavy analytics.
+#
+# Rollup cubes, cohort unit economics and the transaction cube run in a
+# ProcessPoolExecutor instead of the Streamlit script thread. The service is
+# one per process (shared by every session) and keeps the last finished result
+# of each job together with the version of the inputs it was computed from.
+# Asking for a job whose inputs changed starts a new run but still returns the
+# previous result, so pages keep showing last-known values with a "refreshing"
+# badge until the new one lands. No external queue: the pool's workers are
+# local processes. Input versions are the content-hash keys of the refresh
+# scheduler (see refresh.py), so reruns never stat the input files.
+#
+# A failed job is retried for the same inputs after RETRY_DELAY seconds,
+# doubling after every further failure, up to RETRY_ATTEMPTS runs; a pool that
+# broke (a worker was killed, e.g. out of memory) is replaced first.
+#
+# DASHBOARD_COMPUTE_WORKERS sets the pool size; 0 runs jobs inline.
+
+COMPUTE_WORKERS = int(os.environ.get("DASHBOARD_COMPUTE_WORKERS", 2))
+RETRY_ATTEMPTS = 5
+RETRY_DELAY = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def plain_main():
+    """Hide the page from pool workers started inside the block.
+
+    Streamlit executes the page as __main__, and spawned workers import the
+    parent's __main__ first, which would run the whole dashboard in each one.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+class Failure:
+    """Latest failure of a job: its inputs, error and when to try again."""
+
+    def __init__(self, version, error, attempts, func, args):
+        self.version = version
+        self.error = error
+        self.attempts = attempts
+        self.func = func
+        self.args = args
+        self.retry_at = time.monotonic() + RETRY_DELAY * 2 ** (attempts - 1)
+
+    def due(self):
+        return self.attempts < RETRY_ATTEMPTS and time.monotonic() >= self.retry_at
+
+
+class ComputeService:
+    """Runs jobs in a process pool and keeps their latest results."""
+
+    def __init__(self, workers=COMPUTE_WORKERS):
+        self.workers = workers
+        self.executor = self.new_executor()
+        self.lock = threading.RLock()  # finish() runs inline for futures already done
+        self.results = {}  # name -> (version, value, run number)
+        self.running = {}  # name -> (version, future)
+        self.failed = {}  # name -> Failure of the latest version that failed
+        self.runs = itertools.count()
+
+    def new_executor(self):
+        if not self.workers:
+            return None
+        # forkserver: the Streamlit server is multi-threaded, so no plain fork.
+        # The server imports the analytics modules once and workers fork from it
+        context = get_context("forkserver")
+        context.set_forkserver_preload(["cohorts", "data_store", "transactions"])
+        return ProcessPoolExecutor(self.workers, mp_context=context)
+
+    def result(self, name, version, func, *args):
+        """(value, refreshing) for job ``name`` computed from inputs ``version``.
+
+        Starts ``func(*args)`` when there is no result for ``version`` yet.
+        ``value`` is the last finished result, possibly for an older version,
+        or None before the first one.
+        """
+        with self.lock:
+            done = self.results.get(name)
+            if done is None or done[0] != version:
+                self.start(name, version, func, args)
+            done = self.results.get(name)
+            running = self.running.get(name)
+            return (done[1] if done else None), running is not None
+
+    def latest(self, name):
+        """(version, value) of the last finished result of job ``name``, or (None, None)."""
+        with self.lock:
+            done = self.results.get(name)
+            return (done[0], done[1]) if done else (None, None)
+
+    def start(self, name, version, func, args):
+        running = self.running.get(name)
+        if running is not None and running[0] == version:
+            return
+        failure = self.failed.get(name)
+        if failure is not None and failure.version == version and not failure.due():
+            return
+        run = next(self.runs)
+        if self.executor is None:
+            try:
+                self.results[name] = (version, func(*args), run)
+                self.failed.pop(name, None)
+            except Exception as error:
+                self.fail(name, version, error, func, args)
+            return
+        # Workers are started on submit
+        with plain_main():
+            try:
+                future = self.executor.submit(func, *args)
+            except BrokenProcessPool:
+                # A worker died; start over with a fresh pool
+                self.executor = self.new_executor()
+                future = self.executor.submit(func, *args)
+        self.running[name] = (version, future)
+        executor = self.executor
+        future.add_done_callback(
+            lambda future: self.finish(name, version, run, future, func, args, executor)
+        )
+
+    def finish(self, name, version, run, future, func, args, executor):
+        with self.lock:
+            if self.running.get(name, (None,))[0] == version:
+                del self.running[name]
+            try:
+                value = future.result()
+            except BrokenProcessPool as error:
+                # Every job of the pool fails with it; the retries go to a
+                # fresh pool, made once by whichever job reports it first
+                if self.executor is executor:
+                    self.executor = self.new_executor()
+                self.fail(name, version, error, func, args)
+                return
+            except Exception as error:
+                self.fail(name, version, error, func, args)
+                return
+            failure = self.failed.get(name)
+            if failure is not None and failure.version == version:
+                del self.failed[name]
+            # A slow run of older inputs must not replace a newer result
+            done = self.results.get(name)
+            if done is None or done[2] < run:
+                self.results[name] = (version, value, run)
+
+    def fail(self, name, version, error, func, args):
+        failure = self.failed.get(name)
+        attempts = failure.attempts + 1 if failure is not None and failure.version == version else 1
+        logger.error("Compute job %s failed (attempt %d of %d): %s", name, attempts, RETRY_ATTEMPTS, error)
+        self.failed[name] = Failure(version, error, attempts, func, args)
+
+    def retry(self):
+        """Restart the failed jobs whose retry is due."""
+        for name, failure in list(self.failed.items()):
+            if failure.due() and name not in self.running:
+                self.start(name, failure.version, failure.func, failure.args)
+
+    def error(self, name):
+        """Exception of job ``name`` once it has used up its retries, else None."""
+        with self.lock:
+            failure = self.failed.get(name)
+            return failure.error if failure is not None and failure.attempts >= RETRY_ATTEMPTS else None
+
+    def busy(self):
+        """Whether jobs are running or waiting to be retried; starts due retries."""
+        with self.lock:
+            self.retry()
+            return bool(self.running) or any(
+                failure.attempts < RETRY_ATTEMPTS for failure in self.failed.values()
+            )
+
+    def wait(self, timeout=None):
+        """Block until every running job has finished."""
+        with self.lock:
+            futures = [future for _, future in self.running.values()]
+        wait(futures, timeout)
+
+
+@st.cache_resource(show_spinner=False)
+def compute_service():
+    return ComputeService()
+
+
+def store_rollups(store):
+    """``store`` with the rollup cube built for its version.
+
+    The store is shared by every session, so the cube goes on a copy. Until
+    the cube of this version is finished the store is returned as loaded,
+    without rollups, never with a cube of other data.
+    """
+    name = ("rollups", str(store.data_dir))
+    service = compute_service()
+    service.result(name, store.version, build_rollups, store.data_dir, store.version)
+    version, cube = service.latest(name)
+    if version != store.version:
+        return store
+    return store.with_rollups(cube)
+
+
+def current_store(data_dir=DATA_DIR):
+    """load_store() with its rollups (see store_rollups)."""
+    return store_rollups(load_store(data_dir))
+
+
+def files_version(name, directory, files):
+    """Version key of the files ``files(directory)`` lists, from the refresh scheduler."""
+    return refresh_scheduler().watch((name, str(directory)), directory, files).version
+
+
+def cohort_economics(company, directory=COHORTS_DIR):
+    """Last computed per-cohort unit economics for ``company``, or None."""
+    economics, _ = compute_service().result(
+        ("unit_economics", company, str(directory)),
+        files_version("cohorts", directory, cohort_files),
+        company_unit_economics,
+        company,
+        directory,
+    )
+    return economics
+
+
+def transaction_cube(directory=TRANSACTIONS_DIR):
+    """Last built TransactionCube of ``directory``, or None."""
+    cube, _ = compute_service().result(
+        ("transactions", str(directory)),
+        files_version("transactions", directory, transaction_files),
+        build_cube,
+        directory,
+    )
+    return cube
+
+
+@st.fragment(run_every=1)
+def refreshing_badge():
+    """Shown while jobs run; reruns the page once their results are in."""
+    if compute_service().busy():
+        st.caption("🔄 Refreshing analytics…")
+    else:
+        st.rerun()
@@ -0,0 +1,430 @@
+import copy
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from refresh import file_hash, refresh_scheduler
+from rollups import RollupCube, parse_periods
+
+# Columnar store for the case-study metrics.
+#
+# Every source file holds long-format rows of
+# (company, metric, period, currency, unit, value). For breakdown metrics such
+# as pie slices the period column holds the slice label. ``currency`` is the
+# ISO code of monetary metrics and ``unit`` the scale the value is reported in
+# (K, M, B); both are empty for plain counts and percentages.
+#
+# Arrow IPC/Feather files are memory-mapped and Parquet files are read with
+# memory_map=True, so opening the store does not copy the column data. The
+# store only keeps an index of row positions per (company, metric); charts
+# take just the rows of the slice they plot.
+#
+# For comparisons across companies every row also gets a ``base_value``: the
+# value in base units and converted to REPORTING_CURRENCY with the rates in
+# data/fx/rates.csv (currency, rate in USD). It is computed once for the whole
+# table when the files are read.
+#
+# Rollups to coarser granularities (see rollups.py) are built by the compute
+# pool, not by load_store: the shared store keeps an empty cube, and
+# compute.store_rollups hands out copies of it holding the cube built for its
+# version.
+#
+# The combined table is read-only and the same for every session, so it is
+# built once and written as an Arrow IPC file in SHARED_DIR, named by the
+# version of the files it came from. Every process that needs it (each server
+# of a multi-process deployment, the compute workers) memory-maps that file:
+# the column buffers live in the OS page cache once instead of on each heap,
+# and sessions only hold references to them.
+#
+# SHARED_DIR defaults to a per-user folder in the system temp directory,
+# created 0700. A directory or file that another user owns or can write is
+# refused instead of mapped, since every session would read from it. Older
+# versions are removed once they have been superseded for SHARED_RETENTION
+# seconds; a process still mapping one keeps reading it until the refresh
+# scheduler swaps in the new store, which happens well within that time.
+#
+# The refresh scheduler (see refresh.py) watches the files by content hash and
+# reopens the store in the background when one changes. The combined table
+# records the rows of each source file in its schema metadata, so a reload
+# reads only the files that changed and reuses the other files' rows from the
+# previous table.
+
+DATA_DIR = Path(
+    os.environ.get("DASHBOARD_DATA_DIR", Path(__file__).parent / "data")
+)
+REPORTING_CURRENCY = os.environ.get("DASHBOARD_CURRENCY", "USD")
+SHARED_DIR = Path(
+    os.environ.get(
+        "DASHBOARD_SHARED_DIR",
+        Path(tempfile.gettempdir()) / f"dashboard-store-{os.getuid() if hasattr(os, 'getuid') else 'user'}",
+    )
+)
+SHARED_RETENTION = float(os.environ.get("DASHBOARD_SHARED_RETENTION", 24 * 60 * 60))
+
+SCHEMA = pa.schema(
+    [
+        ("company", pa.string()),
+        ("metric", pa.string()),
+        ("period", pa.string()),
+        ("currency", pa.string()),
+        ("unit", pa.string()),
+        ("value", pa.float64()),
+    ]
+)
+
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+UNIT_SCALES = {"": 1.0, "K": 1e3, "M": 1e6, "B": 1e9}
+
+
+def read_table(path):
+    """Read one source file as an Arrow table with the store schema."""
+    path = Path(path)
+    if path.suffix in ARROW_SUFFIXES:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    elif path.suffix == ".parquet":
+        import pyarrow.parquet as pq  # only when a Parquet file is present
+
+        table = pq.read_table(path, memory_map=True)
+    elif path.suffix == ".csv":
+        table = pa_csv.read_csv(
+            path,
+            convert_options=pa_csv.ConvertOptions(
+                column_types=SCHEMA,
+                include_columns=SCHEMA.names,
+                include_missing_columns=True,
+            ),
+        )
+    else:
+        raise ValueError(f"Unsupported data file: {path}")
+    # Files written before the currency and unit columns existed get them empty
+    for field in SCHEMA:
+        if field.name not in table.column_names:
+            table = table.append_column(field, pa.nulls(len(table), field.type))
+    table = table.select(SCHEMA.names).cast(SCHEMA)
+    for name in ("currency", "unit"):
+        column = pc.fill_null(table[name], "")
+        table = table.set_column(SCHEMA.get_field_index(name), name, column)
+    return table
+
+
+def source_files(data_dir):
+    """Data files in ``data_dir`` in a stable order."""
+    suffixes = ARROW_SUFFIXES + (".parquet", ".csv")
+    return sorted(p for p in Path(data_dir).iterdir() if p.suffix in suffixes)
+
+
+def dictionary_codes(column):
+    """Integer code per row plus the list of distinct values."""
+    encoded = column.dictionary_encode().unify_dictionaries()
+    if encoded.num_chunks == 0:
+        return np.empty(0, dtype=np.int64), []
+    codes = np.concatenate(
+        [chunk.indices.to_numpy(zero_copy_only=False) for chunk in encoded.chunks]
+    )
+    return codes.astype(np.int64), encoded.chunk(0).dictionary.to_pylist()
+
+
+def read_fx_rates(directory):
+    """Currency -> USD per unit from ``directory``/rates.csv; USD only if missing."""
+    path = Path(directory) / "rates.csv"
+    if not path.exists():
+        return {"USD": 1.0}
+    table = pa_csv.read_csv(path)
+    return dict(zip(table["currency"].to_pylist(), table["rate"].to_pylist()))
+
+
+def base_values(table, rates, currency=REPORTING_CURRENCY):
+    """Every row's value in base units and ``currency``.
+
+    The factor is looked up once per distinct currency and unit, then
+    broadcast to the rows by dictionary code.
+    """
+    currency_codes, currencies = dictionary_codes(table["currency"])
+    unit_codes, units = dictionary_codes(table["unit"])
+    missing = [code for code in currencies if code and code not in rates]
+    if missing or currency not in rates:
+        raise ValueError(f"No FX rate for {', '.join(missing or [currency])}")
+    fx = np.array([rates[code] / rates[currency] if code else 1.0 for code in currencies])
+    scale = np.array([UNIT_SCALES[unit] for unit in units])
+    values = table["value"].to_numpy()
+    if len(values) == 0:
+        return values
+    return values * fx[currency_codes] * scale[unit_codes]
+
+
+def read_store_table(data_dir, reuse=None):
+    """Every data file in ``data_dir`` as one table, with its base values.
+
+    ``reuse`` maps file names to tables already read from them. The file
+    names and row counts are stored in the schema metadata as "partitions".
+    """
+    reuse = reuse or {}
+    paths = source_files(data_dir)
+    tables = [reuse[path.name] if path.name in reuse else read_table(path) for path in paths]
+    table = pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+    values = base_values(table, read_fx_rates(Path(data_dir) / "fx"))
+    table = table.append_column("base_value", pa.array(values, pa.float64()))
+    partitions = [[path.name, len(part)] for path, part in zip(paths, tables)]
+    return table.replace_schema_metadata({"partitions": json.dumps(partitions)})
+
+
+def data_files(data_dir):
+    """Every file the store reads: the data files, then the FX rates."""
+    fx_dir = Path(data_dir) / "fx"
+    return source_files(data_dir) + (sorted(fx_dir.iterdir()) if fx_dir.is_dir() else [])
+
+
+def data_version(data_dir):
+    """Sorted (name, content hash) of the files the store reads: its version key."""
+    return tuple(
+        sorted((path.relative_to(data_dir).as_posix(), file_hash(path)) for path in data_files(data_dir))
+    )
+
+
+def check_private(path):
+    """Raise PermissionError unless ``path`` is owned by this user and writable only by it."""
+    info = os.lstat(path)
+    if hasattr(os, "getuid") and (
+        info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    ):
+        raise PermissionError(f"{path} is not private to this user")
+    return info
+
+
+def shared_dir():
+    """SHARED_DIR, created 0700 if missing and checked to be private."""
+    SHARED_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not stat.S_ISDIR(check_private(SHARED_DIR).st_mode):
+        raise PermissionError(f"{SHARED_DIR} is not a directory")
+    return SHARED_DIR
+
+
+def remove_superseded(directory, pattern):
+    """Delete files matching ``pattern`` superseded by a newer one over SHARED_RETENTION ago."""
+    cutoff = time.time() - SHARED_RETENTION
+    files = []
+    for path in directory.glob(pattern):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except OSError:
+            pass
+    files.sort()
+    # A file is superseded when the next newer version was written
+    for (_, stale), (superseded, _) in zip(files, files[1:]):
+        if superseded < cutoff:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def shared_table(data_dir, version=None, previous=None):
+    """read_store_table(data_dir), memory-mapped from its file in SHARED_DIR.
+
+    The first process to ask writes the file; the others map the same one.
+    Files unchanged since the ``previous`` MetricStore are not read again.
+    """
+    version = data_version(data_dir) if version is None else version
+    source = hashlib.sha1(str(Path(data_dir).resolve()).encode()).hexdigest()[:12]
+    key = hashlib.sha1(repr((REPORTING_CURRENCY, version)).encode()).hexdigest()[:12]
+    directory = shared_dir()
+    path = directory / f"store-{source}-{key}.arrow"
+    if not path.exists():
+        table = read_store_table(data_dir, previous.unchanged(version) if previous else None)
+        # Written under a private name and renamed, so readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        remove_superseded(directory, f"store-{source}-*.arrow")
+    if not stat.S_ISREG(check_private(path).st_mode):
+        raise PermissionError(f"{path} is not a regular file")
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def build_rollups(data_dir=DATA_DIR, version=None):
+    """Rollup cube for the files in ``data_dir``; runs in the compute pool."""
+    return RollupCube(shared_table(data_dir, version))
+
+
+class MetricStore:
+    """Arrow table of metric rows indexed by (company, metric)."""
+
+    def __init__(self, table, rollups=None, data_dir=None, version=None):
+        """``table`` as read by read_store_table; the cube is built unless given.
+
+        ``data_dir`` and ``version`` record where the table came from, so the
+        compute pool can rebuild its cube.
+        """
+        self.table = table
+        self.data_dir = data_dir
+        self.version = version
+        self.loaded = datetime.now()
+
+        # Source file of each row range (see read_store_table)
+        partitions = json.loads((table.schema.metadata or {}).get(b"partitions", b"[]"))
+        self.partitions = [name for name, _ in partitions]
+        self.partition_stops = np.cumsum([rows for _, rows in partitions], dtype=np.int64)
+
+        # Group row positions by (company, metric); the stable sort keeps the
+        # period order of the source files inside each group
+        company_codes, companies = dictionary_codes(table["company"])
+        metric_codes, metrics = dictionary_codes(table["metric"])
+        n_metrics = max(len(metrics), 1)
+        keys = company_codes * n_metrics + metric_codes
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.diff(keys[order], prepend=-1))
+        stops = np.append(starts[1:], len(order))
+
+        self.index = {}
+        for start, stop in zip(starts, stops):
+            key = keys[order[start]]
+            company, metric = companies[key // n_metrics], metrics[key % n_metrics]
+            self.index[(company, metric)] = order[start:stop]
+
+        self.rollups = RollupCube(table) if rollups is None else rollups
+
+    def with_rollups(self, rollups):
+        """Copy sharing this store's table and index, with ``rollups`` as its cube."""
+        store = copy.copy(self)
+        store.rollups = rollups
+        return store
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def unchanged(self, version):
+        """name -> rows of each file whose content hash is the same in ``version``."""
+        before, after = dict(self.version or ()), dict(version)
+        tables, start = {}, 0
+        for name, stop in zip(self.partitions, self.partition_stops):
+            if before.get(name) is not None and before.get(name) == after.get(name):
+                rows = self.table.slice(start, stop - start).select(SCHEMA.names)
+                tables[name] = rows.replace_schema_metadata(None)
+            start = stop
+        return tables
+
+    def metric_version(self, company, metrics):
+        """(file, content hash) of the files holding ``company``'s ``metrics``.
+
+        Changes only when one of those files does; caches keyed on it keep
+        their entries when other files are edited.
+        """
+        hashes = dict(self.version or ())
+        files = set()
+        for metric in metrics:
+            rows = self.index.get((company, metric), np.empty(0, dtype=np.int64))
+            files.update(np.searchsorted(self.partition_stops, rows, side="right").tolist())
+        return tuple((self.partitions[i], hashes.get(self.partitions[i])) for i in sorted(files))
+
+    def slice(self, company, metric, periods=None):
+        """Arrow rows for one (company, metric), optionally limited to ``periods``."""
+        rows = self.index.get((company, metric))
+        if rows is None:
+            raise KeyError(f"No data for {company!r} / {metric!r}")
+        table = self.table.take(rows)
+        if periods is not None:
+            table = table.filter(pc.is_in(table["period"], pa.array(periods)))
+        return table
+
+    def series(self, company, metric, periods=None, level=None, base=False):
+        """``period``/``value`` DataFrame for one (company, metric).
+
+        With ``level`` the precomputed rollup at that granularity is returned
+        instead of the reported periods. With ``base`` the values are in base
+        units and REPORTING_CURRENCY.
+        """
+        column = "base_value" if base else "value"
+        if level is not None:
+            series = self.rollups.series(company, metric, level, column)
+            return series if periods is None else series[series["period"].isin(periods)]
+        table = self.slice(company, metric, periods).select(["period", column])
+        return table.rename_columns(["period", "value"]).to_pandas()
+
+    def frame(self, company, columns, period="Period", periods=None, level=None, base=False):
+        """Wide DataFrame with one column per metric, aligned on period.
+
+        ``columns`` maps metric names to the column names used by the chart.
+        Rows follow the period order of the first metric.
+        """
+        frame = None
+        for metric, column in columns.items():
+            series = self.series(company, metric, periods, level, base).rename(
+                columns={"period": period, "value": column}
+            )
+            frame = series if frame is None else frame.merge(series, on=period)
+        return frame
+
+    def compare(self, metric, companies, level):
+        """``metric`` for several companies side by side, in base units.
+
+        Columns are ``period`` and one per company, rows are in chronological
+        order at ``level``; periods a company did not report are NaN.
+        """
+        frame = None
+        for company in companies:
+            series = self.series(company, metric, level=level, base=True).rename(
+                columns={"value": company}
+            )
+            frame = series if frame is None else frame.merge(series, on="period", how="outer")
+        _, starts = parse_periods(frame["period"])
+        return frame.iloc[np.argsort(starts.to_numpy(), kind="stable")].reset_index(drop=True)
+
+    def companies(self, metric):
+        """Companies reporting ``metric``."""
+        return [company for company, name in self.index if name == metric]
+
+    def is_monetary(self, company, metric):
+        return self.slice(company, metric)["currency"][0].as_py() != ""
+
+    def value(self, company, metric, period):
+        """Single value for one (company, metric, period)."""
+        values = self.slice(company, metric, [period])["value"]
+        if len(values) != 1:
+            raise KeyError(f"No single value for {company!r} / {metric!r} / {period!r}")
+        return values[0].as_py()
+
+
+def open_store(data_dir, version, previous=None):
+    """MetricStore of ``data_dir`` at ``version``.
+
+    The table is shared with other processes (see shared_table) and the
+    rollup cube starts empty (see compute.store_rollups).
+    """
+    return MetricStore(
+        shared_table(data_dir, version, previous),
+        rollups=RollupCube(),
+        data_dir=Path(data_dir),
+        version=version,
+    )
+
+
+def load_store(data_dir=DATA_DIR):
+    """Current MetricStore of ``data_dir``, shared by every session.
+
+    Opened on first use; after that the refresh scheduler swaps in a new one
+    when a file's content changes.
+    """
+    source = refresh_scheduler().watch(
+        ("store", str(data_dir)),
+        data_dir,
+        data_files,
+        lambda previous, version: open_store(data_dir, version, previous),
+    )
+    return source.value
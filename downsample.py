@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Server-side downsampling for long line charts.
+#
+# A half-width chart cannot show more distinct points than it has pixels, so
+# traces are reduced to at most MAX_POINTS before they are sent to the browser.
+# LTTB (largest triangle three buckets) keeps the visual shape of the line;
+# min/max bucketing keeps every spike and is cheaper on very long series.
+
+MAX_POINTS = int(os.environ.get("DASHBOARD_MAX_POINTS", 800))
+
+
+def numeric_axis(values):
+    """Values as float64 for the triangle areas; positions if not numeric."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("int64").to_numpy(dtype=np.float64)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    return np.arange(len(values), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Row positions picked by largest-triangle-three-buckets."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into
+    # n_out - 2 buckets that each contribute one point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+
+    # Average of the following bucket is the third vertex of each triangle
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    counts = stops - starts
+    next_x = np.append(((cum_x[stops] - cum_x[starts]) / counts)[1:], x[-1])
+    next_y = np.append(((cum_y[stops] - cum_y[starts]) / counts)[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, stop) in enumerate(zip(starts, stops)):
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (next_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Row positions of the min and max of each of n_out / 2 equal buckets."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    buckets = np.arange(n) * max(n_out // 2, 1) // n
+    grouped = pd.Series(y).dropna().groupby(buckets[~np.isnan(y)])
+    return np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())
+
+
+def downsample(data, x, y, max_points=MAX_POINTS, method="lttb"):
+    """Rows of ``data`` reduced to at most ``max_points`` for plotting."""
+    if max_points is None or len(data) <= max_points:
+        return data
+    y_values = data[y].to_numpy(dtype=np.float64)
+    if method == "minmax":
+        rows = minmax_indices(y_values, max_points)
+    elif method == "lttb":
+        rows = lttb_indices(numeric_axis(data[x]), y_values, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return data.iloc[rows]
+
+
+def zoom_range(data, x, key, max_points=MAX_POINTS):
+    """Rows of ``data`` inside the range picked on a zoom slider.
+
+    The slider is only shown when the series is longer than ``max_points``.
+    Narrowing it re-downsamples just the selected range, so the zoomed view is
+    drawn at a higher resolution than the full-range view.
+    """
+    if max_points is None or len(data) <= max_points:
+        return data
+
+    values = data[x]
+    if pd.api.types.is_datetime64_any_dtype(values):
+        bounds = (values.min().to_pydatetime(), values.max().to_pydatetime())
+        low, high = st.slider("Zoom", *bounds, value=bounds, key=key)
+        return data[(values >= low) & (values <= high)]
+    if pd.api.types.is_numeric_dtype(values):
+        bounds = (float(values.min()), float(values.max()))
+        low, high = st.slider("Zoom", *bounds, value=bounds, key=key)
+        return data[(values >= low) & (values <= high)]
+
+    # Category axes zoom by position
+    low, high = st.slider("Zoom", 0, len(data) - 1, (0, len(data) - 1), key=key)
+    return data.iloc[low:high + 1]
@@ -0,0 +1,165 @@
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from multiprocessing.util import Finalize
+from pathlib import Path
+
+# Image export of every dashboard chart, for board packs.
+#
+# Each tab of Dashboard.py is run once headlessly (see snapshot.run_tab) and
+# every Plotly chart on it is taken as the figure JSON Streamlit would send to
+# the browser, brand template included. The images are rendered with kaleido
+# in a process pool. Starting kaleido's headless Chrome costs far more than
+# rendering one chart, so each worker starts one renderer when it starts and
+# reuses it for every image it is given. Charts of a tab are submitted as
+# soon as that tab has run, so rendering overlaps with collecting the rest.
+#
+#   python export.py [--format png svg pdf] [--out exports/] [--workers 4]
+#
+# Writes <out>/<tab>/<nn>-<chart title>.<format> and prints the time of every
+# chart. Needs kaleido (requirements-export.txt) and a Chrome it can drive
+# (kaleido_get_chrome, or plotly_get_chrome, downloads one).
+
+ROOT = Path(__file__).resolve().parent
+EXPORT_DIR = Path(os.environ.get("DASHBOARD_EXPORT_DIR", ROOT / "exports"))
+FORMATS = ("png", "svg", "pdf")
+WIDTH = 1000
+HEIGHT = 500
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:60] or "chart"
+
+
+def tab_figures(tab):
+    """[(title, figure JSON)] of the charts on ``tab``, in page order.
+
+    A chart is named after its own title, or else the closest heading above it.
+    """
+    from snapshot import run_tab  # runs the app; not needed in the workers
+
+    figures, heading = [], tab
+
+    def walk(node):
+        nonlocal heading
+        if node.type in ("title", "header", "subheader"):
+            heading = node.proto.body
+        elif node.type == "plotly_chart":
+            title = json.loads(node.proto.spec).get("layout", {}).get("title", {})
+            figures.append((title.get("text") or heading, node.proto.spec))
+        for child in getattr(node, "children", {}).values():
+            walk(child)
+
+    walk(run_tab(tab).main)
+    return figures
+
+
+# This worker's (event loop, kaleido.Kaleido), set by start_renderer
+RENDERER = None
+
+
+def start_renderer():
+    """Pool initializer: one kaleido renderer per worker, used for every image.
+
+    Raises here, breaking the pool, when kaleido cannot start its browser.
+    """
+    global RENDERER
+    import asyncio
+
+    import kaleido
+
+    loop = asyncio.new_event_loop()
+    renderer = kaleido.Kaleido()
+    loop.run_until_complete(renderer.open())
+    # Pool workers leave through os._exit, which skips atexit; finalizers run
+    Finalize(None, lambda: loop.run_until_complete(renderer.close()), exitpriority=0)
+    RENDERER = loop, renderer
+
+
+def render_chart(spec, path, formats, scale):
+    """Write ``spec`` as ``path`` with each suffix in ``formats``; seconds per format."""
+    loop, renderer = RENDERER
+    figure = json.loads(spec)
+    layout = figure.get("layout", {})
+    size = dict(width=layout.get("width") or WIDTH, height=layout.get("height") or HEIGHT)
+    seconds = {}
+    for fmt in formats:
+        start = time.perf_counter()
+        image = loop.run_until_complete(
+            renderer.calc_fig(figure, opts=dict(format=fmt, scale=scale, **size))
+        )
+        path.with_suffix(f".{fmt}").write_bytes(image)
+        seconds[fmt] = time.perf_counter() - start
+    return seconds
+
+
+def export(tabs, out_dir=EXPORT_DIR, formats=("png",), workers=None, scale=2):
+    """Render every chart of ``tabs``; {tab: [(file stem, seconds per format)]}."""
+    from compute import plain_main
+
+    workers = workers or min(4, os.cpu_count() or 1)
+    results = {tab: [] for tab in tabs}
+    # spawn: workers only import this module and plotly, not the app
+    with ProcessPoolExecutor(
+        workers, mp_context=get_context("spawn"), initializer=start_renderer
+    ) as pool:
+        futures = {}
+        for tab in tabs:
+            start = time.perf_counter()
+            figures = tab_figures(tab)
+            print(f"{tab:<10} {len(figures)} charts collected in {time.perf_counter() - start:.2f} s")
+            tab_dir = Path(out_dir) / tab
+            tab_dir.mkdir(parents=True, exist_ok=True)
+            for index, (title, spec) in enumerate(figures, 1):
+                path = tab_dir / f"{index:02d}-{slug(title)}"
+                # Workers are started on submit, while the app may be __main__
+                with plain_main():
+                    futures[pool.submit(render_chart, spec, path, formats, scale)] = (tab, path)
+
+        for future in as_completed(futures):
+            tab, path = futures[future]
+            seconds = future.result()
+            results[tab].append((path.name, seconds))
+            timings = "  ".join(f"{fmt} {ms * 1000:7.1f} ms" for fmt, ms in seconds.items())
+            print(f"{tab:<10} {path.name:<50} {timings}")
+    return results
+
+
+def main():
+    from snapshot import TABS
+
+    parser = argparse.ArgumentParser(description="Export every dashboard chart as images")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["png"])
+    parser.add_argument("--out", type=Path, default=EXPORT_DIR, help="output directory")
+    parser.add_argument("--tabs", nargs="+", choices=list(TABS), default=list(TABS))
+    parser.add_argument("--workers", type=int, help="renderer processes (default: up to 4)")
+    parser.add_argument("--scale", type=float, default=2, help="pixel scale of PNGs")
+    args = parser.parse_args()
+    if importlib.util.find_spec("kaleido") is None:
+        parser.exit(1, "kaleido is needed for image export: pip install -r requirements-export.txt\n")
+
+    start = time.perf_counter()
+    results = export(args.tabs, args.out, args.format, args.workers, args.scale)
+    total = time.perf_counter() - start
+    for tab, charts in results.items():
+        rendering = sum(sum(seconds.values()) for _, seconds in charts)
+        print(f"{tab:<10} {len(charts):>3} charts  {rendering:6.2f} s rendering")
+    print(f"Wrote {sum(map(len, results.values()))} charts to {args.out} in {total:.2f} s")
+    # os._exit skips flushing; without it piped or redirected output is lost
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)  # without waiting for the app's compute pool
+
+
+if __name__ == "__main__":
+    # Run as the imported module, so pool tasks refer to export.render_chart
+    # rather than to whatever __main__ is when they are submitted
+    from export import main
+
+    main()
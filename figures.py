@@ -0,0 +1,327 @@
+import functools
+import os
+
+import streamlit as st
+import plotly.graph_objects as go
+
+import wire
+from downsample import downsample
+from themes import BASE_TEMPLATE
+
+# Figure builders shared by all dashboards.
+#
+# Every builder is memoized with st.cache_resource, so the cache key is the
+# hash of the input DataFrame plus every styling argument. A rerun that passes
+# the same data and styling gets the already-built (and already-validated)
+# go.Figure back instead of constructing it again. The returned figures are
+# shared between sessions and must not be mutated by callers.
+#
+# The figures are cached already in the wire format of wire.py: the current
+# format and threshold are part of the cache key, so with the binary format a
+# rerun gets the encoded figure back instead of encoding it again. The
+# unencoded builder is available as ``builder.__wrapped__``.
+#
+# Pass template="revolut" (or "telda", "amex") through **layout to style a
+# figure with its brand template from themes.py; the lean base template is
+# used otherwise, never the heavy Plotly/Streamlit default.
+#
+# plotly.express is imported inside the px_* builders: it pulls in most of
+# Plotly's submodules and accounts for the bulk of the app's own import time,
+# while the first page only draws graph_objects charts.
+
+# Upper bound on cached figures per builder; the oldest entries are evicted
+FIGURE_CACHE_MAX_ENTRIES = 64
+
+
+
+def cached_figure(builder):
+    """Memoize ``builder``, returning its figure in the current wire format."""
+
+    # Wire settings go in as a keyword, so they are hashed with the arguments
+    @st.cache_resource(max_entries=FIGURE_CACHE_MAX_ENTRIES, show_spinner=False)
+    @functools.wraps(builder)
+    def encoded(*args, wire_settings, **kwargs):
+        return wire.wire_figure(builder(*args, **kwargs), *wire_settings)
+
+    @functools.wraps(builder)
+    def build(*args, **kwargs):
+        return encoded(*args, wire_settings=(wire.WIRE_FORMAT, wire.BINARY_THRESHOLD), **kwargs)
+
+    return build
+
+# Line charts are drawn as SVG ("svg"), WebGL ("webgl"), or WebGL once a trace
+# has more than WEBGL_THRESHOLD points ("auto"). The count is taken before
+# downsampling: a downsampled trace never exceeds MAX_POINTS, well below the
+# threshold, while the series it stands for does. Builders also take a
+# render_mode argument to override this per chart.
+RENDER_MODE = os.environ.get("DASHBOARD_RENDER_MODE", "auto")
+WEBGL_THRESHOLD = int(os.environ.get("DASHBOARD_WEBGL_THRESHOLD", 5000))
+
+
+def apply_layout(fig, layout):
+    """update_layout with ``layout`` on top of the base template."""
+    fig.update_layout(**{"template": BASE_TEMPLATE, **layout})
+    return fig
+
+
+def use_webgl(n_points, render_mode=None):
+    """Whether a trace of ``n_points`` should be drawn with WebGL."""
+    render_mode = render_mode or RENDER_MODE
+    if render_mode not in ("auto", "svg", "webgl"):
+        raise ValueError(f"Unknown render mode: {render_mode}")
+    if render_mode == "auto":
+        return n_points > WEBGL_THRESHOLD
+    return render_mode == "webgl"
+
+
+@cached_figure
+def line_figure(
+    data,
+    x,
+    y,
+    color,
+    width=None,
+    marker_size=None,
+    marker_color=None,
+    name=None,
+    hovertemplate=None,
+    max_points=None,
+    render_mode=None,
+    forecast=None,
+    **layout,
+):
+    """Single line+markers trace of column ``y`` against column ``x``.
+
+    Series longer than ``max_points`` are downsampled before plotting.
+    ``forecast`` (period, value, lower, upper rows from forecasting.py)
+    continues the line dashed, inside a shaded band.
+    """
+    scatter = go.Scattergl if use_webgl(len(data), render_mode) else go.Scatter
+    data = downsample(data, x, y, max_points)
+
+    marker = {}
+    if marker_size is not None:
+        marker["size"] = marker_size
+    if marker_color is not None:
+        marker["color"] = marker_color
+
+    fig = go.Figure()
+    fig.add_trace(
+        scatter(
+            x=data[x],
+            y=data[y],
+            mode="lines+markers",
+            line=dict(color=color, width=width),
+            marker=marker or None,
+            name=name,
+            hovertemplate=hovertemplate,
+        )
+    )
+    if forecast is not None:
+        add_forecast(fig, data[x].iloc[-1], data[y].iloc[-1], forecast, color)
+    apply_layout(fig, layout)
+    return fig
+
+
+def add_forecast(fig, x, y, forecast, color):
+    """Dashed projection from the last point (x, y), with its band shaded."""
+    periods = [x] + list(forecast["period"])
+    fig.add_trace(
+        go.Scatter(
+            x=periods + periods[::-1],
+            y=[y] + list(forecast["upper"]) + list(forecast["lower"])[::-1] + [y],
+            fill="toself",
+            fillcolor=translucent(color, 0.15),
+            line=dict(width=0),
+            hoverinfo="skip",
+            showlegend=False,
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=periods,
+            y=[y] + list(forecast["value"]),
+            mode="lines+markers",
+            line=dict(color=color, dash="dash"),
+            name="Projection",
+            hovertemplate="<b>%{x}</b><br>Projection: %{y:.1f}<extra></extra>",
+        )
+    )
+
+
+def translucent(color, alpha):
+    """rgba() of a "#rrggbb" color."""
+    red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({red}, {green}, {blue}, {alpha})"
+
+
+@cached_figure
+def px_line_figure(data, x, y, color, max_points=None, render_mode=None, **layout):
+    """Plotly Express line chart with markers in a single color."""
+    import plotly.express as px
+
+    webgl = use_webgl(len(data), render_mode)
+    data = downsample(data, x, y, max_points)
+    fig = px.line(
+        data,
+        x=x,
+        y=y,
+        markers=True,
+        line_shape="linear",
+        render_mode="webgl" if webgl else "svg",
+    )
+    fig.update_traces(line=dict(color=color), marker=dict(color=color))
+    apply_layout(fig, layout)
+    return fig
+
+
+@cached_figure
+def multi_line_figure(data, x, ys, names, colors, **layout):
+    """One line+markers trace per column in ``ys``, bridging missing periods."""
+    fig = go.Figure()
+    for y, name, color in zip(ys, names, colors):
+        fig.add_trace(
+            go.Scatter(
+                x=data[x],
+                y=data[y],
+                mode="lines+markers",
+                name=name,
+                line=dict(color=color),
+                connectgaps=True,
+            )
+        )
+    apply_layout(fig, layout)
+    return fig
+
+
+@cached_figure
+def grouped_bar_figure(data, x, ys, names, colors, bands=None, **layout):
+    """One bar trace per column in ``ys``, grouped side by side.
+
+    ``bands`` maps a column of ``ys`` to its (lower, upper) columns, drawn as
+    error bars on the rows where they are set.
+    """
+    fig = go.Figure()
+    bands = bands or {}
+    for y, name, color in zip(ys, names, colors):
+        error_y = None
+        if y in bands:
+            lower, upper = (data[column] for column in bands[y])
+            error_y = dict(
+                type="data",
+                symmetric=False,
+                array=upper - data[y],
+                arrayminus=data[y] - lower,
+            )
+        fig.add_trace(go.Bar(x=data[x], y=data[y], name=name, marker_color=color, error_y=error_y))
+    apply_layout(fig, dict(barmode="group", **layout))
+    return fig
+
+
+@cached_figure
+def bar_figure(data, x, y, colors, text_format=None, **layout):
+    """Single bar trace, optionally labelled above each bar."""
+    text = None
+    if text_format is not None:
+        text = [text_format.format(v) for v in data[y]]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=data[x],
+            y=data[y],
+            marker_color=colors,
+            text=text,
+            textposition="outside" if text else None,
+        )
+    )
+    apply_layout(fig, layout)
+    return fig
+
+
+@cached_figure
+def px_bar_figure(data, x, y, colors, color=None, labels=None, **layout):
+    """Plotly Express bar chart, colored per ``color`` column if given."""
+    import plotly.express as px
+
+    fig = px.bar(
+        data,
+        x=x,
+        y=y,
+        color=color,
+        color_discrete_sequence=colors,
+        labels=labels,
+    )
+    apply_layout(fig, layout)
+    return fig
+
+
+@cached_figure
+def pie_figure(data, names, values, colors, hole=None, **layout):
+    """Pie (or donut when ``hole`` > 0) of ``values`` labelled by ``names``."""
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=data[names],
+                values=data[values],
+                hole=hole,
+                marker_colors=colors,
+            )
+        ]
+    )
+    apply_layout(fig, layout)
+    return fig
+
+
+@cached_figure
+def stat_donut_figure(value, total, color, text, caption, height=300, template=BASE_TEMPLATE):
+    """Donut filled to ``value`` out of ``total`` with the figure in its center."""
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                values=[value, total - value],
+                hole=0.6,
+                marker_colors=[color, "#F0F0F0"],
+                textinfo="none",
+                showlegend=False,
+            )
+        ]
+    )
+
+    # Place the headline number and its caption inside the hole
+    fig.update_layout(
+        template=template,
+        height=height,
+        margin=dict(t=0, b=0, l=0, r=0),
+        annotations=[
+            dict(
+                text=f"<b>{text}</b>",
+                x=0.5, y=0.5,
+                font=dict(size=40, color=color),
+                showarrow=False
+            ),
+            dict(
+                text=f"<br>{caption}",
+                x=0.5, y=0.35,
+                font=dict(size=12, color="gray"),
+                showarrow=False,
+            ),
+        ],
+    )
+    return fig
+
+
+def tail_figure(data, x, ys, colors, **layout):
+    """One line per column in ``ys`` for short, constantly changing tails.
+
+    Not cached: live data changes on every tick, so entries would never be
+    reused and would only push the static figures out of the cache. Encoded
+    for the wire on every call instead.
+    """
+    fig = go.Figure()
+    for y, color in zip(ys, colors):
+        fig.add_trace(
+            go.Scatter(x=data[x], y=data[y], mode="lines", name=y.title(), line=dict(color=color))
+        )
+    apply_layout(fig, layout)
+    return wire.wire_figure(fig)
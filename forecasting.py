@@ -0,0 +1,246 @@
+import re
+import threading
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from rollups import bucket_labels, parse_periods
+
+# Growth forecasts for every dated series in the store.
+#
+# Each (company, metric) with at least MIN_POINTS positive dated values gets a
+# log-linear growth fit, log(value) = a + b * years, and a prediction band from
+# its residuals. A fit only needs six running sums per series (n, Σt, Σt², Σy,
+# Σty, Σy² with y = log value), so the model keeps them as one array for all
+# companies and metrics: loading the store fills it with np.bincount over the
+# whole table, solving every fit is column arithmetic on that array, and a
+# period that lands later only adds its row to the sums. The solved parameters
+# are kept until the sums change again.
+#
+# The rows already in the sums are kept as a frame indexed by (company,
+# metric, period). A new store version is compared with it in one merge, which
+# finds the added rows and any changed or removed ones, and period labels are
+# parsed once per distinct label, as in rollups.py.
+#
+# Bands cover CONFIDENCE of the normal distribution around the fit and are
+# always drawn with the projection: with a handful of points the fitted growth
+# rate is uncertain, and the band shows how much. Below MIN_POINTS there are
+# no residuals to estimate that from, so those series are not projected.
+
+CONFIDENCE = 0.8
+HORIZON = 2  # periods projected past the last reported one
+MIN_POINTS = 3
+
+FREQS = {"day": "D", "month": "M", "quarter": "Q", "year": "Y"}
+EPOCH = np.datetime64("2000-01-01", "ns")
+DAYS_PER_YEAR = 365.25
+
+
+def years(starts):
+    """Timestamps as fractional years since 2000, the fits' time axis."""
+    return (np.asarray(starts, dtype="datetime64[ns]") - EPOCH) / np.timedelta64(1, "D") / DAYS_PER_YEAR
+
+
+KEY = ["company", "metric", "period"]
+POINT_COLUMNS = KEY + ["value", "level", "start"]
+
+
+def dated_points(table):
+    """(company, metric, period, value, level, start) of the positive dated rows.
+
+    One row per (company, metric, period); the last one wins.
+    """
+    frame = table.select(["company", "metric", "period", "value"]).to_pandas()
+    frame = frame[frame["value"] > 0].drop_duplicates(KEY, keep="last")
+    codes, labels = pd.factorize(frame["period"])
+    levels, starts = parse_periods(pd.Series(np.asarray(labels, dtype=object)))
+    frame = frame.assign(level=levels.to_numpy()[codes], start=starts.to_numpy()[codes])
+    return frame[frame["level"].notna()].reset_index(drop=True)[POINT_COLUMNS]
+
+
+def period_label(start, level, like):
+    """Label of a projected period, written like the series' last label ``like``."""
+    if re.match(r"^FY\d{2}$", like):
+        return f"FY{start:%y}"
+    if re.match(r"^[A-Z][a-z]{2} \d{4}$", like):
+        return f"{start:%b %Y}"
+    return bucket_labels(pd.Series([start]), level).iloc[0]
+
+
+class ForecastModel:
+    """Running sums and fitted growth of every dated series."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # (company, metric) of each row of stats
+        self.keys = pd.MultiIndex.from_tuples([], names=["company", "metric"])
+        self.stats = np.zeros((0, 6))
+        # start, level and label of each series' latest period
+        self.last = pd.DataFrame(
+            {"start": np.empty(0, "datetime64[ns]"), "level": [], "period": []}, index=self.keys
+        ).astype({"level": object, "period": object})
+        # value of every (company, metric, period) in the sums
+        self.seen = pd.DataFrame(
+            {"company": [], "metric": [], "period": [], "value": np.empty(0)}
+        ).astype({name: object for name in KEY})
+        self.version = None
+        self.params = None
+
+    def update(self, table, version=None):
+        """Bring the model up to date with ``table``; returns the model.
+
+        Rows not seen before are added to the sums. If a seen value changed or
+        disappeared the sums are rebuilt from scratch.
+        """
+        with self.lock:
+            if version is not None and version == self.version:
+                return self
+            points = dated_points(table)
+            merged = points.merge(
+                self.seen, on=KEY, how="outer", suffixes=("", "_seen"), indicator=True
+            )
+            kept = merged["_merge"] == "both"
+            if (merged["_merge"] == "right_only").any() or (
+                merged.loc[kept, "value"] != merged.loc[kept, "value_seen"]
+            ).any():
+                self.reset()
+                new = points
+            else:
+                new = merged.loc[merged["_merge"] == "left_only", POINT_COLUMNS]
+            if len(new):
+                self.add(new)
+            self.version = version
+            return self
+
+    def append(self, company, metric, period, value):
+        """Add one newly reported period of ``metric``."""
+        levels, starts = parse_periods(pd.Series([period]))
+        if levels.iloc[0] is None or value <= 0:
+            return
+        with self.lock:
+            self.add(
+                pd.DataFrame(
+                    {
+                        "company": [company],
+                        "metric": [metric],
+                        "period": [period],
+                        "value": [float(value)],
+                        "level": levels,
+                        "start": starts,
+                    }
+                )
+            )
+
+    def add(self, points):
+        """Fold ``points`` into the sums, one bincount per statistic."""
+        series = pd.MultiIndex.from_frame(points[["company", "metric"]])
+        self.keys = self.keys.append(series.unique().difference(self.keys, sort=False))
+        codes = self.keys.get_indexer(series)
+        t = years(points["start"])
+        y = np.log(points["value"].to_numpy(dtype=np.float64))
+        sums = np.column_stack(
+            [np.bincount(codes, w, minlength=len(self.keys)) for w in (None, t, t * t, y, t * y, y * y)]
+        )
+        self.stats = np.vstack([self.stats, np.zeros((len(self.keys) - len(self.stats), 6))]) + sums
+
+        self.seen = pd.concat([self.seen, points[KEY + ["value"]]], ignore_index=True)
+        # Latest period per series; on a tie the one already known stays
+        latest = pd.concat(
+            [points[["company", "metric", "start", "level", "period"]], self.last.reset_index()],
+            ignore_index=True,
+        )
+        self.last = (
+            latest.sort_values("start", kind="stable")
+            .drop_duplicates(["company", "metric"], keep="last")
+            .set_index(["company", "metric"])
+        )
+        self.params = None
+
+    def fit(self):
+        """Intercept, slope and residual spread of every series, solved at once."""
+        if self.params is None:
+            n, s_t, s_tt, s_y, s_ty, s_yy = self.stats.T
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sxx = s_tt - s_t * s_t / n
+                sxy = s_ty - s_t * s_y / n
+                slope = sxy / sxx
+                intercept = (s_y - slope * s_t) / n
+                sse = np.maximum(s_yy - s_y * s_y / n - slope * sxy, 0.0)
+                spread = np.where(n > 2, np.sqrt(sse / (n - 2)), 0.0)
+            self.params = dict(
+                n=n, mean=s_t / np.maximum(n, 1), sxx=sxx,
+                intercept=intercept, slope=slope, spread=spread,
+            )
+        return self.params
+
+    def forecast(self, company, metric, horizon=HORIZON, confidence=CONFIDENCE):
+        """``period``/``value``/``lower``/``upper`` for the next ``horizon`` periods.
+
+        None when the series has fewer than MIN_POINTS dated values.
+        """
+        with self.lock:
+            if (company, metric) not in self.keys:
+                return None
+            row = self.keys.get_loc((company, metric))
+            params = self.fit()
+            n, sxx = params["n"][row], params["sxx"][row]
+            if n < MIN_POINTS or not sxx > 0:
+                return None
+            start, level, label = self.last.loc[(company, metric)]
+
+        period = pd.Timestamp(start).to_period(FREQS[level])
+        starts = [(period + step).start_time for step in range(1, horizon + 1)]
+        t = years(starts)
+        center = params["intercept"][row] + params["slope"][row] * t
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        width = z * params["spread"][row] * np.sqrt(1 + 1 / n + (t - params["mean"][row]) ** 2 / sxx)
+        return pd.DataFrame(
+            {
+                "period": [period_label(s, level, label) for s in starts],
+                "value": np.exp(center),
+                "lower": np.exp(center - width),
+                "upper": np.exp(center + width),
+            }
+        )
+
+    def ratio_forecast(self, company, numerator, denominator, horizon=HORIZON):
+        """Projection of ``numerator / denominator`` as the ratio of both projections.
+
+        Periods are matched on their start and labelled like ``numerator``.
+        The band runs from the lowest to the highest ratio the two bands
+        allow, so it covers at least CONFIDENCE.
+        """
+        num = self.forecast(company, numerator, horizon)
+        den = self.forecast(company, denominator, horizon)
+        if num is None or den is None:
+            return None
+        num = num.assign(start=parse_periods(num["period"])[1])
+        den = den.assign(start=parse_periods(den["period"])[1])
+        frame = num.merge(
+            den[["start", "value", "lower", "upper"]], on="start", suffixes=("", "_den")
+        )
+        if frame.empty:
+            return None
+        return pd.DataFrame(
+            {
+                "period": frame["period"],
+                "value": frame["value"] / frame["value_den"],
+                "lower": frame["lower"] / frame["upper_den"],
+                "upper": frame["upper"] / frame["lower_den"],
+            }
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def forecast_model():
+    return ForecastModel()
+
+
+def store_forecasts(store):
+    """The shared forecast model, up to date with ``store``."""
+    return forecast_model().update(store.table, store.version)
@@ -0,0 +1,220 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from rollups import parse_periods
+
+# KPI engine for the dashboard cards.
+#
+# Each metric keeps only its latest and previous period plus running totals, so
+# appending a period is O(1) no matter how long the history is. KPIs such as
+# YoY growth, ARPU, margins, ROI and LTV/CAC are derived from that state instead
+# of being typed into the cards.
+#
+# Growth compares the latest period with the previous one, so it is labelled
+# by the level of the periods: MoM for monthly series, QoQ for quarterly, YoY
+# for yearly.
+
+GROWTH_SUFFIXES = {"day": "DoD", "month": "MoM", "quarter": "QoQ", "year": "YoY"}
+
+
+class MetricState:
+    """Latest two periods and running totals of one metric."""
+
+    __slots__ = ("period", "value", "previous_period", "previous", "total", "count")
+
+    def __init__(self):
+        self.period = self.value = None
+        self.previous_period = self.previous = None
+        self.total = 0.0
+        self.count = 0
+
+    def push(self, period, value):
+        self.previous_period, self.previous = self.period, self.value
+        self.period, self.value = period, value
+        self.total += value
+        self.count += 1
+
+
+class KpiEngine:
+    """Incrementally updated KPIs for one company."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    @classmethod
+    def from_store(cls, store, company, metrics):
+        """Engine primed with the full history of ``metrics`` from the store."""
+        engine = cls()
+        engine.sync(store, company, metrics)
+        return engine
+
+    def sync(self, store, company, metrics):
+        """Append the periods of ``metrics`` added to the store since the last sync.
+
+        A metric whose last known period no longer matches the store (edited
+        or removed rows) is replayed from its full history instead.
+        """
+        for metric in metrics:
+            if (company, metric) not in store:
+                self.metrics.pop(metric, None)
+                continue
+            series = store.series(company, metric)
+            periods, values = list(series["period"]), series["value"].tolist()
+            state = self.metrics.get(metric)
+            known = state.count if state is not None else 0
+            if known and not (
+                known <= len(periods)
+                and periods[known - 1] == state.period
+                and values[known - 1] == state.value
+            ):
+                del self.metrics[metric]
+                known = 0
+            for period, value in zip(periods[known:], values[known:]):
+                self.append(metric, period, value)
+
+    def copy(self):
+        """Independent engine with the same state."""
+        engine = KpiEngine()
+        for metric, state in self.metrics.items():
+            engine.metrics[metric] = copy = MetricState()
+            for name in MetricState.__slots__:
+                setattr(copy, name, getattr(state, name))
+        return engine
+
+    def append(self, metric, period, value):
+        """Add the next period of ``metric``."""
+        self.metrics.setdefault(metric, MetricState()).push(period, float(value))
+
+    def state(self, metric):
+        if metric not in self.metrics:
+            raise KeyError(f"No data for metric {metric!r}")
+        return self.metrics[metric]
+
+    def latest(self, metric):
+        return self.state(metric).value
+
+    def period(self, metric):
+        return self.state(metric).period
+
+    def growth(self, metric):
+        """Change of the latest period over the previous one, as a fraction."""
+        state = self.state(metric)
+        if not state.previous:
+            return None
+        return state.value / state.previous - 1
+
+    def growth_suffix(self, metric):
+        """Label of growth(metric): ``MoM``, ``QoQ`` or ``YoY`` by its periods."""
+        return growth_suffix(self.period(metric))
+
+    def ratio(self, numerator, denominator):
+        """Latest ``numerator`` divided by latest ``denominator``."""
+        value = self.latest(denominator)
+        return self.latest(numerator) / value if value else None
+
+    def margin(self, profit, revenue):
+        """Latest ``profit`` over ``revenue`` for the same period."""
+        if self.period(profit) != self.period(revenue):
+            return None
+        return self.ratio(profit, revenue)
+
+    def roi(self, revenue, investment):
+        """Return on the latest period's investment."""
+        return roi(self.latest(revenue), self.latest(investment))
+
+
+def growth_suffix(period):
+    """``MoM``/``QoQ``/``YoY`` for a period label; ``vs prev.`` if it is not a date."""
+    levels, _ = parse_periods(pd.Series([str(period)]))
+    return GROWTH_SUFFIXES.get(levels[0], "vs prev.")
+
+
+def roi(revenue, investment):
+    """Return on investment as a fraction; works on scalars and Series."""
+    return (revenue - investment) / investment
+
+
+def ratio_series(store, company, numerator, denominator, level=None):
+    """``period``/``value`` of ``numerator / denominator`` in every period both report.
+
+    Reported periods are matched on their start, so ``FY23`` revenue meets
+    ``2023`` users, and labelled like ``numerator``. Periods where the
+    denominator is zero are left out.
+    """
+    num = store.series(company, numerator, level=level)
+    den = store.series(company, denominator, level=level)
+    on = "period"
+    if level is None:
+        on = "start"
+        num = num.assign(start=parse_periods(num["period"])[1])
+        den = den.assign(start=parse_periods(den["period"])[1])
+    frame = num.merge(den[[on, "value"]], on=on, suffixes=("", "_den"))
+    frame = frame[frame["value_den"] != 0]
+    return pd.DataFrame(
+        {"period": frame["period"], "value": frame["value"] / frame["value_den"]}
+    ).reset_index(drop=True)
+
+
+class CompanyKpis:
+    """Published KpiEngine of one company and set of metrics.
+
+    When a file holding the metrics changes, a copy of the engine gets the
+    new periods appended and replaces it; an engine handed out is never
+    modified afterwards.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.engine = KpiEngine()
+        self.version = None
+
+    def get(self, store, company, metrics):
+        version = store.metric_version(company, metrics)
+        with self.lock:
+            if version != self.version:
+                engine = self.engine.copy()
+                engine.sync(store, company, metrics)
+                self.engine, self.version = engine, version
+            return self.engine
+
+
+def company_kpis(store, company, metrics):
+    """KPI engine for ``company``, caught up with the files holding ``metrics``."""
+    return kpi_engines(company, metrics).get(store, company, metrics)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def kpi_engines(company, metrics):
+    return CompanyKpis()
+
+
+# ---------- formatting for the cards ----------
+
+
+def format_number(value, decimals=None):
+    """Thousands-separated number; at most one decimal unless ``decimals`` is set."""
+    if decimals is None:
+        return f"{round(value, 1):,g}"
+    return f"{value:,.{decimals}f}"
+
+
+def format_money(value, symbol, unit="", decimals=None):
+    """``188`` -> ``£188M`` with ``symbol="£", unit="M"``."""
+    return f"{symbol}{format_number(value, decimals)}{unit}"
+
+
+def format_percent(fraction, signed=False, decimals=None):
+    """``1.35`` -> ``+135%`` when ``signed``; ``n/a`` for None."""
+    if fraction is None:
+        return "n/a"
+    sign = "+" if signed and fraction > 0 else ""
+    return f"{sign}{format_number(fraction * 100, decimals)}%"
+
+
+def format_growth(fraction, suffix="YoY"):
+    """Growth fraction as ``+135% YoY``; ``n/a`` without a previous period."""
+    if fraction is None:
+        return "n/a"
+    return f"{format_percent(fraction, signed=True, decimals=0)} {suffix}"
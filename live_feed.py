@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from data_store import DATA_DIR
+from figures import tail_figure
+from kpis import KpiEngine, format_number
+from profiling import plot_chart
+from themes import BRANDS
+
+# Live metrics mode.
+#
+# A local producer appends JSON lines such as
+#   {"company": "telda", "metric": "transactions", "value": 42, "time": "..."}
+# to LIVE_FEED. One LiveFeed per process tails that file and keeps the recent
+# events plus an incremental KpiEngine per company. The live panel is a
+# st.fragment with run_every, so each tick re-runs only the panel's cards and
+# trace tail instead of the whole dashboard script.
+#
+# Run ``python live_feed.py`` to append demo events for local testing.
+
+LIVE_FEED = Path(os.environ.get("DASHBOARD_LIVE_FEED", DATA_DIR / "live" / "feed.jsonl"))
+LIVE_INTERVAL = float(os.environ.get("DASHBOARD_LIVE_INTERVAL", 2))
+LIVE_METRICS = ("transactions", "users")
+
+# Points kept per company for the trace tails
+TAIL_LENGTH = 200
+
+logger = logging.getLogger(__name__)
+
+
+class LiveFeed:
+    """Tail of the live feed file, shared by every session in the process."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.lock = threading.Lock()
+        self.tails = {}
+        self.engines = {}
+
+    def poll(self):
+        """Read complete lines appended since the last poll."""
+        with self.lock:
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                return
+            if size < self.offset:
+                # The file was truncated or rotated; start over
+                self.offset = 0
+            if size == self.offset:
+                return
+            with self.path.open("rb") as feed:
+                feed.seek(self.offset)
+                chunk = feed.read(size - self.offset)
+            # Only complete lines; the offset moves past each one once it is consumed
+            for line in chunk[: chunk.rfind(b"\n") + 1].splitlines(keepends=True):
+                if line.strip():
+                    try:
+                        self.add(json.loads(line))
+                    except (ValueError, KeyError, TypeError) as error:
+                        logger.warning("Skipping bad live feed line at byte %d: %s", self.offset, error)
+                self.offset += len(line)
+
+    def add(self, event):
+        """Record one event; raises before changing any state if it is malformed."""
+        company, metric = event["company"], event["metric"]
+        when = pd.Timestamp(event.get("time") or datetime.now())
+        value = float(event["value"])
+        self.engines.setdefault(company, KpiEngine()).append(metric, when, value)
+        tail = self.tails.setdefault(company, deque(maxlen=TAIL_LENGTH))
+        tail.append({"time": when, "metric": metric, "value": value})
+
+    def snapshot(self, company):
+        """(engine copy, tail DataFrame) for ``company``; (None, None) before any event."""
+        with self.lock:
+            if company not in self.engines:
+                return None, None
+            # Copies, so the panel reads them while poll keeps appending
+            return self.engines[company].copy(), pd.DataFrame(list(self.tails[company]))
+
+
+@st.cache_resource(show_spinner=False)
+def live_feed(path=LIVE_FEED):
+    return LiveFeed(path)
+
+
+@st.fragment(run_every=LIVE_INTERVAL)
+def live_panel(company):
+    """Live KPI cards and trace tail for ``company``, refreshed every tick."""
+    feed = live_feed()
+    feed.poll()
+    engine, tail = feed.snapshot(company)
+
+    st.subheader("🔴 Live")
+    if engine is None:
+        st.caption(f"Waiting for events in {feed.path}")
+        return
+
+    cols = st.columns(len(LIVE_METRICS) + 1)
+    for col, metric in zip(cols, LIVE_METRICS):
+        with col:
+            if metric not in engine.metrics:
+                continue
+            state = engine.state(metric)
+            st.metric(
+                f"{metric.title()} (live)",
+                format_number(state.total),
+                f"+{format_number(state.value)}",
+            )
+    with cols[-1]:
+        st.metric("Last event", tail["time"].iloc[-1].strftime("%H:%M:%S"))
+
+    wide = tail.pivot_table(index="time", columns="metric", values="value").reset_index()
+    metrics = [metric for metric in LIVE_METRICS if metric in wide]
+    fig = tail_figure(
+        wide,
+        "time",
+        metrics,
+        colors=BRANDS[company][:2],
+        height=250,
+        margin=dict(t=30, b=20, l=40, r=20),
+        template=company,
+    )
+    plot_chart(fig)
+
+
+def produce_demo_events(path=LIVE_FEED, interval=1.0):
+    """Append random transaction and user counts to ``path`` forever."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"Appending demo events to {path} every {interval}s (Ctrl+C to stop)")
+    while True:
+        with path.open("a") as feed:
+            for company in ("revolut", "telda", "amex"):
+                for metric, high in (("transactions", 500), ("users", 40)):
+                    event = {
+                        "company": company,
+                        "metric": metric,
+                        "value": random.randint(0, high),
+                        "time": datetime.now().isoformat(timespec="seconds"),
+                    }
+                    feed.write(json.dumps(event) + "\n")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    produce_demo_events()
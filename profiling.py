@@ -0,0 +1,169 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+
+# Render-time instrumentation for the dashboard sections.
+#
+# Wrap a block in ``with section("revolut/kpi_cards"):`` to record its wall
+# time and the number of memory blocks it left allocated. Figures drawn with
+# plot_chart() inside a section also record their JSON size, but only while
+# profiling is on (?debug=1 or DASHBOARD_PROFILE=1), since that serializes the
+# figure a second time. With PYTHONTRACEMALLOC set, the tracemalloc peak is
+# recorded as well. Block counts are process-wide, so concurrent sessions
+# blur each other's numbers.
+#
+# Each rerun's records are kept in session state for the debug panel. Totals
+# across all reruns are exported as JSON and Prometheus text by a local HTTP
+# server when DASHBOARD_METRICS_PORT is set.
+
+METRICS_PORT = os.environ.get("DASHBOARD_METRICS_PORT")
+PROFILE_ALWAYS = os.environ.get("DASHBOARD_PROFILE") == "1"
+
+
+class SectionStats:
+    """Per-section totals across every rerun in the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sections = {}
+
+    def add(self, record):
+        with self.lock:
+            stats = self.sections.setdefault(
+                record["section"],
+                {"count": 0, "seconds_sum": 0.0, "blocks_sum": 0, "figure_bytes": 0},
+            )
+            stats["count"] += 1
+            stats["seconds_sum"] += record["seconds"]
+            stats["blocks_sum"] += record["blocks"]
+            if record["figure_bytes"]:
+                stats["figure_bytes"] = record["figure_bytes"]
+
+    def as_json(self):
+        with self.lock:
+            return json.dumps(self.sections, indent=2)
+
+    def as_prometheus(self):
+        """Prometheus text exposition format."""
+        metrics = [
+            ("dashboard_section_seconds_sum", "seconds_sum", "counter",
+             "Total wall time spent rendering the section"),
+            ("dashboard_section_renders_total", "count", "counter",
+             "Number of times the section was rendered"),
+            ("dashboard_section_allocated_blocks_sum", "blocks_sum", "counter",
+             "Memory blocks left allocated by the section"),
+            ("dashboard_section_figure_bytes", "figure_bytes", "gauge",
+             "Figure JSON size of the last profiled render"),
+        ]
+        lines = []
+        with self.lock:
+            for name, key, kind, help_text in metrics:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for section, stats in sorted(self.sections.items()):
+                    lines.append(f'{name}{{section="{section}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+
+STATS = SectionStats()
+
+
+def profiling_enabled():
+    return PROFILE_ALWAYS or st.query_params.get("debug") == "1"
+
+
+def start_rerun():
+    """Reset the per-rerun records; call once at the top of the script."""
+    st.session_state["_profile"] = []
+    st.session_state["_profile_stack"] = []
+
+
+@contextmanager
+def section(name):
+    """Time the enclosed block as section ``name``."""
+    record = {"section": name, "seconds": 0.0, "blocks": 0, "figure_bytes": 0, "peak_bytes": None}
+    stack = st.session_state.setdefault("_profile_stack", [])
+    stack.append(record)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        record["blocks"] = sys.getallocatedblocks() - blocks
+        if tracing:
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        stack.pop()
+        st.session_state.setdefault("_profile", []).append(record)
+        STATS.add(record)
+
+
+def plot_chart(fig, **kwargs):
+    """st.plotly_chart that records the figure's JSON size while profiling.
+
+    Figures from figures.py are already in the wire format of wire.py.
+    """
+    stack = st.session_state.get("_profile_stack")
+    if stack and profiling_enabled():
+        stack[-1]["figure_bytes"] += len(pio.to_json(fig, validate=False))
+    kwargs.setdefault("use_container_width", True)
+    return st.plotly_chart(fig, **kwargs)
+
+
+def debug_panel():
+    """Section timings for this rerun; only shown with ?debug=1 in the URL."""
+    if st.query_params.get("debug") != "1":
+        return
+    records = st.session_state.get("_profile", [])
+    with st.expander("🛠️ Render profile", expanded=True):
+        frame = pd.DataFrame(records)
+        if not frame.empty:
+            frame["ms"] = frame.pop("seconds") * 1000
+            st.dataframe(frame, use_container_width=True, hide_index=True)
+            st.caption(f"Total: {frame['ms'].sum():.1f} ms across {len(frame)} sections")
+        st.download_button("Download JSON", json.dumps(records, indent=2), "profile.json")
+        if METRICS_PORT:
+            st.caption(f"Scrape http://127.0.0.1:{METRICS_PORT}/metrics (or /metrics.json)")
+        st.code(STATS.as_prometheus(), language="text")
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = STATS.as_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = STATS.as_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics and /metrics.json on localhost once per process."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("127.0.0.1", int(port)), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
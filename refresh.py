@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+# Background refresh of the local data sources.
+#
+# One RefreshScheduler per process runs an asyncio loop in a daemon thread.
+# Every REFRESH_INTERVAL seconds it stats the files of each watched source. A
+# file whose size or mtime moved is hashed in a worker thread, and only a new
+# content hash counts as a change, so touching a file or copying the same
+# bytes over it does nothing.
+#
+# A source's version key is the sorted (name, content hash) of its files: the
+# same bytes give the same key in every process, and the key changes exactly
+# when the content does. Sources with a ``reload`` function also keep a value
+# (the metric store) that is rebuilt in the background from the previous one
+# and the new key, then swapped in; reruns only read the current value and
+# key and never touch the files.
+#
+# DASHBOARD_REFRESH_INTERVAL sets the polling interval in seconds.
+
+REFRESH_INTERVAL = float(os.environ.get("DASHBOARD_REFRESH_INTERVAL", 5))
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path, chunk=1 << 20):
+    """Content hash of the file at ``path``."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(chunk), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Source:
+    """One watched source: the files under ``root`` listed by ``files(root)``."""
+
+    def __init__(self, root, files, reload=None):
+        self.root = Path(root)
+        self.files = files
+        self.reload = reload
+        self.stats = {}  # name -> (size, mtime_ns)
+        self.hashes = {}  # name -> content hash
+        self.version = None
+        self.value = None
+        self.updated = None  # time.time() of the last change
+        self.lock = threading.Lock()  # one refresh at a time
+
+    def scan(self):
+        """(stats, hashes) of the files now, hashing only the ones that moved."""
+        stats, hashes = {}, {}
+        for path in self.files(self.root):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed between listing and stat
+            name = path.relative_to(self.root).as_posix()
+            stats[name] = (stat.st_size, stat.st_mtime_ns)
+            if self.stats.get(name) == stats[name] and name in self.hashes:
+                hashes[name] = self.hashes[name]
+            else:
+                hashes[name] = file_hash(path)
+        return stats, hashes
+
+    def refresh(self):
+        """Rescan; reload and bump the version when the content changed.
+
+        True when the version changed.
+        """
+        with self.lock:
+            return self.update()
+
+    def update(self):
+        stats, hashes = self.scan()
+        if hashes == self.hashes and self.version is not None:
+            self.stats = stats
+            return False
+        version = tuple(sorted(hashes.items()))
+        if self.reload is not None:
+            try:
+                value = self.reload(self.value, version)
+            except Exception as error:
+                # Keep serving the previous value. Stats and hashes stay as
+                # they were, so the next poll hashes and reloads again
+                logger.error("Reloading %s failed: %s", self.root, error)
+                if self.version is not None:
+                    return False
+                raise
+            self.value = value
+        self.stats, self.hashes = stats, hashes
+        self.version = version
+        self.updated = time.time()
+        return True
+
+
+class RefreshScheduler:
+    """Polls every watched source from an asyncio loop in a daemon thread."""
+
+    def __init__(self, interval=REFRESH_INTERVAL):
+        self.interval = interval
+        self.sources = {}
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="refresh", daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.poll(), self.loop)
+
+    def watch(self, key, root, files, reload=None):
+        """The Source registered as ``key``, registering it on first use.
+
+        The first scan (and load) happens before this returns, so the page
+        that asks first has a version and value to render; later ones are
+        picked up by the background polls.
+        """
+        with self.lock:
+            source = self.sources.get(key)
+            if source is None:
+                source = Source(root, files, reload)
+                source.refresh()
+                self.sources[key] = source
+            return source
+
+    def versions(self):
+        """key -> version of every watched source."""
+        with self.lock:
+            return {key: source.version for key, source in self.sources.items()}
+
+    async def refresh(self, source):
+        try:
+            # Stats, hashes and reloads are blocking I/O: run them off the loop
+            await self.loop.run_in_executor(None, source.refresh)
+        except Exception as error:
+            logger.error("Refreshing %s failed: %s", source.root, error)
+
+    async def poll(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            with self.lock:
+                sources = list(self.sources.values())
+            await asyncio.gather(*(self.refresh(source) for source in sources))
+
+
+@st.cache_resource(show_spinner=False)
+def refresh_scheduler():
+    return RefreshScheduler()
+
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def rerun_on_refresh(seen):
+    """Reruns the page once a source has a newer version than ``seen``.
+
+    ``seen`` is refresh_scheduler().versions() as of the end of the full run.
+    """
+    if refresh_scheduler().versions() != seen:
+        st.rerun()
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Pre-aggregated rollups for the granularity selectors.
+#
+# When the store is opened, every row whose period label is a date, month,
+# quarter or year is rolled up to each coarser level, plus to the company's
+# strategic phases when it defines any. Only sums and counts are stored, keyed
+# by (company, metric, level), for both the reported value and the base_value
+# used for cross-company comparisons. Switching a chart's granularity is then a
+# dict lookup over the already-aggregated periods instead of a rescan of the
+# raw rows.
+
+LEVELS = ("day", "month", "quarter", "year")
+PHASE = "phase"
+
+# Flow metrics add up over a period; everything else (users, shares, ratios)
+# is averaged
+FLOW_METRICS = {
+    "revenue",
+    "operating_profit",
+    "net_income",
+    "transaction_volume",
+    "phase_investment",
+    "phase_revenue",
+}
+
+# Label patterns in order of precedence: (regex, level, labels -> timestamps)
+PERIOD_FORMATS = [
+    (r"^\d{4}-\d{2}-\d{2}$", "day", lambda s: pd.to_datetime(s, format="%Y-%m-%d")),
+    (r"^\d{4}-\d{2}$", "month", lambda s: pd.to_datetime(s, format="%Y-%m")),
+    (r"^[A-Z][a-z]{2} \d{4}$", "month", lambda s: pd.to_datetime(s, format="%b %Y")),
+    (
+        r"^Q[1-4] \d{4}$",
+        "quarter",
+        lambda s: pd.PeriodIndex(s.str[3:] + "Q" + s.str[1], freq="Q").start_time,
+    ),
+    (r"^FY\d{2}$", "year", lambda s: pd.to_datetime("20" + s.str[2:], format="%Y")),
+    (r"^\d{4}$", "year", lambda s: pd.to_datetime(s, format="%Y")),
+]
+
+
+def parse_periods(labels):
+    """Level and start timestamp for each label; None/NaT when not a date."""
+    levels = pd.Series(None, index=labels.index, dtype=object)
+    starts = pd.Series(pd.NaT, index=labels.index, dtype="datetime64[ns]")
+    for pattern, level, to_timestamp in PERIOD_FORMATS:
+        matched = levels.isna() & labels.str.match(pattern)
+        if matched.any():
+            starts[matched] = np.asarray(to_timestamp(labels[matched]), dtype="datetime64[ns]")
+            levels[matched] = level
+    return levels, starts
+
+
+def bucket_labels(starts, level):
+    """Bucket label for each timestamp at ``level``."""
+    if level == "day":
+        return starts.dt.strftime("%Y-%m-%d")
+    if level == "month":
+        return starts.dt.strftime("%Y-%m")
+    if level == "quarter":
+        return "Q" + starts.dt.quarter.astype(str) + " " + starts.dt.year.astype(str)
+    return starts.dt.year.astype(str)
+
+
+def bucket_starts(starts, level):
+    """Start of the ``level`` bucket containing each timestamp."""
+    freq = {"day": "D", "month": "M", "quarter": "Q", "year": "Y"}[level]
+    return starts.dt.to_period(freq).dt.start_time
+
+
+class RollupCube:
+    """Sums and counts per (company, metric, level, period).
+
+    Without a table the cube is empty: no levels, no rollups.
+    """
+
+    def __init__(self, table=None):
+        self.native = {}
+        self.cube = {}
+        self.phases = {}
+        if table is None:
+            return
+
+        frame = table.select(["company", "metric", "period", "value", "base_value"]).to_pandas(
+            strings_to_categorical=True
+        )
+        frame = frame.dropna(subset=["period"])
+
+        # Parse each distinct label once; rows carry the code of their label
+        codes, labels = pd.factorize(frame["period"])
+        levels, starts = parse_periods(pd.Series(np.asarray(labels, dtype=object)))
+        frame["code"] = codes
+        frame["level"] = levels.to_numpy()[codes]
+        frame["start"] = starts.to_numpy()[codes]
+
+        self.phases = self.phase_starts(frame)
+
+        dated = frame[frame["level"].notna()]
+        for (company, metric), level in (
+            dated.groupby(["company", "metric"], observed=True)["level"]
+            .agg(lambda s: min(s, key=LEVELS.index))
+            .items()
+        ):
+            self.native[(company, metric)] = level
+
+        rank = np.array([LEVELS.index(name) if isinstance(name, str) else -1 for name in levels])
+        for level in LEVELS:
+            rows = dated[rank[dated["code"].to_numpy()] <= LEVELS.index(level)]
+            buckets = bucket_starts(starts.dropna(), level).reindex(starts.index)
+            rows = rows.assign(bucket=buckets.to_numpy()[rows["code"].to_numpy()])
+            self.aggregate(rows, level, lambda buckets: bucket_labels(buckets, level))
+
+        # Phases: each dated row falls in the last phase started before it
+        for company, (names, phase_starts) in self.phases.items():
+            rows = dated[dated["company"] == company]
+            position = np.searchsorted(phase_starts, rows["start"].to_numpy(), side="right") - 1
+            rows = rows[position >= 0].assign(bucket=position[position >= 0])
+            self.aggregate(rows, PHASE, lambda buckets: names[buckets.to_numpy()])
+
+    @staticmethod
+    def phase_starts(frame):
+        """Phase names and start timestamps per company from ``phase_start`` rows."""
+        rows = frame[frame["metric"] == "phase_start"].sort_values("value")
+        phases = {}
+        for company, group in rows.groupby("company", observed=True):
+            starts = pd.to_datetime(group["value"].astype(int).astype(str), format="%Y")
+            phases[company] = (group["period"].to_numpy(), starts.to_numpy())
+        return phases
+
+    def aggregate(self, rows, level, label):
+        grouped = (
+            rows.groupby(["company", "metric", "bucket"], sort=True, observed=True)
+            .agg(
+                sum=("value", "sum"),
+                count=("value", "count"),
+                base_sum=("base_value", "sum"),
+            )
+            .reset_index()
+        )
+        for (company, metric), group in grouped.groupby(["company", "metric"], observed=True):
+            self.cube[(company, metric, level)] = pd.DataFrame(
+                {
+                    "period": np.asarray(label(group["bucket"])),
+                    "sum": group["sum"].to_numpy(),
+                    "base_sum": group["base_sum"].to_numpy(),
+                    "count": group["count"].to_numpy(),
+                }
+            )
+
+    def levels(self, company, metric):
+        """Levels a (company, metric) can be shown at, finest first."""
+        native = self.native.get((company, metric))
+        if native is None:
+            return []
+        levels = list(LEVELS[LEVELS.index(native):])
+        if company in self.phases:
+            levels.append(PHASE)
+        return levels
+
+    def series(self, company, metric, level, column="value"):
+        """``period``/``value`` DataFrame of a metric rolled up to ``level``.
+
+        ``column`` is "value" or "base_value".
+        """
+        rollup = self.cube.get((company, metric, level))
+        if rollup is None:
+            raise KeyError(f"No {level} rollup for {company!r} / {metric!r}")
+        total = rollup["base_sum" if column == "base_value" else "sum"]
+        if metric in FLOW_METRICS:
+            value = total
+        else:
+            value = total / rollup["count"]
+        return pd.DataFrame({"period": rollup["period"], "value": value})
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# What-if grid for the phase investments.
+#
+# The phase series give investment I and revenue R per phase, the cac series
+# the cost of acquiring a customer C. The model behind the sliders:
+#
+#   customers acquired in phase q   N_q = I_q * investment / (C_q * cac)
+#   revenue of phase p              R_p * M_p / M_p(base), where
+#                                   M_p = sum over q <= p of N_q * (1 - churn)^(p - q)
+#
+# i.e. revenue follows the customers still active from every phase so far,
+# scaled so the base case (1x investment, 1x CAC, BASE_CHURN) reproduces the
+# reported revenue. ROI, cumulative ROI and payback follow from revenue and
+# investment.
+#
+# The model is evaluated once for every combination of the assumption grids
+# below, in one broadcast NumPy pass, and the resulting cube is cached per
+# version of the phase data. A slider move is then a lookup, or a trilinear
+# interpolation between grid points for values off the grid.
+
+INVESTMENT_GRID = np.round(np.arange(0.5, 1.5001, 0.05), 2)  # x reported investment
+CAC_GRID = np.round(np.arange(0.5, 1.5001, 0.05), 2)  # x reported CAC
+CHURN_GRID = np.round(np.arange(0.0, 0.6001, 0.02), 2)  # share of customers lost per phase
+BASE_CHURN = 0.2
+
+METRICS = ("phase_investment", "phase_revenue", "cac")
+
+
+def active_customers(acquired, churn):
+    """M_p for every churn rate: customers from phases q <= p still active in p.
+
+    ``acquired`` has phases on its last axis; the result gets a churn axis
+    before it.
+    """
+    phases = acquired.shape[-1]
+    lag = np.arange(phases)[:, None] - np.arange(phases)[None, :]  # p - q
+    survival = np.where(
+        lag >= 0, (1 - churn)[:, None, None] ** np.maximum(lag, 0), 0.0
+    )  # (churn, p, q)
+    return np.einsum("...q,kpq->...kp", acquired, survival)
+
+
+def payback_phases(investment, revenue):
+    """Phases until cumulative revenue covers cumulative investment; NaN if never.
+
+    Interpolated within the phase where it happens, so 2.5 is half-way
+    through the third phase.
+    """
+    net = np.cumsum(revenue - investment, axis=-1)
+    covered = net >= 0
+    first = covered.argmax(axis=-1)
+    before = np.take_along_axis(net, np.maximum(first - 1, 0)[..., None], -1)[..., 0]
+    after = np.take_along_axis(net, first[..., None], -1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        within = np.where(first > 0, before / (before - after), 1.0)
+    periods = np.where(first > 0, first + within, 1.0)
+    return np.where(covered.any(axis=-1), periods, np.nan)
+
+
+class ScenarioCube:
+    """Phase results for every (investment, cac, churn) grid point."""
+
+    def __init__(self, phases, investment, revenue, cac):
+        """Per-phase reported ``investment``, ``revenue`` and ``cac`` arrays."""
+        self.phases = list(phases)
+        self.axes = (INVESTMENT_GRID, CAC_GRID, CHURN_GRID)
+
+        # Grid axes broadcast as (investment, cac, churn, phase)
+        scale_i = INVESTMENT_GRID[:, None, None, None]
+        scale_c = CAC_GRID[None, :, None, None]
+        acquired = investment / cac * scale_i / scale_c  # (investment, cac, 1, phase)
+        active = active_customers(acquired[:, :, 0, :], CHURN_GRID)
+        base = active_customers(investment / cac, np.array([BASE_CHURN]))[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.revenue = np.where(base > 0, revenue * active / base, 0.0)
+        self.investment = np.broadcast_to(investment * scale_i, self.revenue.shape)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.roi = self.revenue / self.investment - 1
+            self.cumulative_roi = (
+                np.cumsum(self.revenue, axis=-1) / np.cumsum(self.investment, axis=-1) - 1
+            )
+        self.payback = payback_phases(self.investment, self.revenue)
+
+    @classmethod
+    def from_store(cls, store, company="revolut"):
+        frame = store.frame(
+            company,
+            {"phase_investment": "investment", "phase_revenue": "revenue", "cac": "cac"},
+            period="phase",
+        )
+        return cls(
+            frame["phase"],
+            frame["investment"].to_numpy(dtype=np.float64),
+            frame["revenue"].to_numpy(dtype=np.float64),
+            frame["cac"].to_numpy(dtype=np.float64),
+        )
+
+    def weights(self, point):
+        """Grid slices and trilinear weights for ``point`` = (investment, cac, churn)."""
+        slices, weights = [], []
+        for axis, value in zip(self.axes, point):
+            i = int(np.clip(np.searchsorted(axis, value) - 1, 0, len(axis) - 2))
+            t = float(np.clip((value - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0))
+            slices.append(slice(i, i + 2))
+            weights.append(np.array([1 - t, t]))
+        return tuple(slices), np.einsum("i,j,k->ijk", *weights)
+
+    def lookup(self, cube, point):
+        slices, weights = self.weights(point)
+        corners = cube[slices]
+        return np.tensordot(weights, corners, axes=([0, 1, 2], [0, 1, 2]))
+
+    def at(self, investment=1.0, cac=1.0, churn=BASE_CHURN):
+        """``phase``/``investment``/``revenue``/``roi``/``cumulative_roi`` per phase."""
+        point = (investment, cac, churn)
+        return pd.DataFrame(
+            {
+                "phase": self.phases,
+                "investment": self.lookup(self.investment, point),
+                "revenue": self.lookup(self.revenue, point),
+                "roi": self.lookup(self.roi, point),
+                "cumulative_roi": self.lookup(self.cumulative_roi, point),
+            }
+        )
+
+    def payback_at(self, investment=1.0, cac=1.0, churn=BASE_CHURN):
+        """Phases to payback at the given assumptions; NaN if never."""
+        return float(self.lookup(self.payback, (investment, cac, churn)))
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def phase_scenarios(_store, company, version):
+    """ScenarioCube of ``company``, built once per ``version`` of its phase data."""
+    return ScenarioCube.from_store(_store, company)
+
+
+def store_scenarios(store, company="revolut"):
+    return phase_scenarios(store, company, store.metric_version(company, METRICS))
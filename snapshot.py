@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import plotly
+from plotly.offline import get_plotlyjs
+from streamlit.testing.v1 import AppTest
+
+from cohorts import COHORTS_DIR
+from compute import compute_service
+from data_store import DATA_DIR, source_files
+from refresh import file_hash
+from specs import SPECS_DIR, dashboard_plans
+from transactions import TRANSACTIONS_DIR, transaction_files
+
+# Static snapshot export of the dashboards.
+#
+# Each tab of Dashboard.py is run once headlessly with AppTest, and its element
+# tree (headings, markdown and HTML cards, metrics, columns, Plotly figures) is
+# written out as a plain HTML page. The pages share one plotly.min.js and embed
+# the figures as the compact JSON Streamlit would have sent to the browser, so
+# the bundle can be served by any static file server.
+#
+# A hash of the data files and the app's modules is kept in manifest.json; the
+# export is skipped when nothing it depends on has changed.
+#
+#   python snapshot.py [--out snapshot/] [--force]
+
+ROOT = Path(__file__).resolve().parent
+APP = ROOT / "Dashboard.py"
+SNAPSHOT_DIR = Path(os.environ.get("DASHBOARD_SNAPSHOT_DIR", ROOT / "snapshot"))
+# Same order as the tab bar: the dashboards written in Dashboard.py, the ones
+# declared in dashboards/, then Compare
+TABS = {
+    "revolut": "🏦 Revolut Youth",
+    "amex": "💳 American Express",
+    **{key: plan.label for key, plan in dashboard_plans().items()},
+    "compare": "📊 Compare",
+}
+PLOTLY_JS = "plotly.min.js"
+
+PAGE_STYLE = """
+body { font-family: "Source Sans Pro", sans-serif; margin: 2rem auto; max-width: 1400px; padding: 0 1rem; color: #31333f; }
+nav a { margin-right: 1.5rem; text-decoration: none; color: #667eea; font-weight: 600; }
+nav a.active { color: #31333f; border-bottom: 2px solid #667eea; }
+.row { display: flex; gap: 1rem; }
+.col { min-width: 0; }
+"""
+
+FIGURE_LOADER = """
+document.querySelectorAll("script[data-figure]").forEach(function (node) {
+  var spec = JSON.parse(node.textContent);
+  var div = document.createElement("div");
+  node.parentNode.insertBefore(div, node);
+  Plotly.newPlot(div, spec.data, spec.layout, {responsive: true, displaylogo: false});
+});
+"""
+
+
+def source_hash():
+    """Hash of everything a snapshot depends on: data, cohorts, FX rates,
+    transactions, specs and app code."""
+    files = list(source_files(DATA_DIR)) + sorted(ROOT.glob("*.py"))
+    for directory in (COHORTS_DIR, DATA_DIR / "fx", SPECS_DIR):
+        if directory.is_dir():
+            files += sorted(directory.iterdir())
+    digest = hashlib.sha256(plotly.__version__.encode())
+    for path in files:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    # Transaction files can be large; hash them in chunks
+    for path in transaction_files(TRANSACTIONS_DIR):
+        digest.update(path.name.encode())
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+
+def inline_markdown(text):
+    text = html.escape(text, quote=False)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"\*(.+?)\*", r"<em>\1</em>", text)
+
+
+def markdown_html(text):
+    """The small markdown subset the dashboards use: headings, rules, lists, emphasis."""
+    out, paragraph, items = [], [], []
+
+    def flush():
+        if paragraph:
+            out.append(f"<p>{inline_markdown(' '.join(paragraph))}</p>")
+            paragraph.clear()
+        if items:
+            out.append("<ul>" + "".join(f"<li>{inline_markdown(i)}</li>" for i in items) + "</ul>")
+            items.clear()
+
+    for line in text.strip().splitlines():
+        line = line.strip()
+        heading = re.match(r"^(#{1,6}) (.*)$", line)
+        if not line:
+            flush()
+        elif line == "---":
+            flush()
+            out.append("<hr>")
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{inline_markdown(heading.group(2))}</h{level}>")
+        elif line.startswith("- "):
+            if paragraph:
+                flush()
+            items.append(line[2:])
+        else:
+            if items:
+                flush()
+            paragraph.append(line)
+    flush()
+    return "\n".join(out)
+
+
+def element_html(node):
+    """HTML for one node of an AppTest element tree; widgets are dropped."""
+    kind = node.type
+    if kind in ("title", "header", "subheader"):
+        tag = node.proto.tag or "h2"
+        return f"<{tag}>{html.escape(node.proto.body)}</{tag}>"
+    if kind == "markdown":
+        return node.proto.body if node.proto.allow_html else markdown_html(node.proto.body)
+    if kind == "metric":
+        delta = node.proto.delta
+        return (
+            '<div class="metric-card">'
+            f'<div class="metric-label">{html.escape(node.proto.label)}</div>'
+            f'<div class="metric-value">{html.escape(node.proto.body)}</div>'
+            + (f'<div style="color: #38a169;">{html.escape(delta)}</div>' if delta else "")
+            + "</div>"
+        )
+    if kind == "plotly_chart":
+        # Streamlit's spec is compact JSON with "<" escaped, safe inside <script>
+        return f'<script type="application/json" data-figure>{node.proto.spec}</script>'
+    if kind == "column":
+        return f'<div class="col" style="flex: {node.weight}">{children_html(node)}</div>'
+    if kind == "flex_container" and any(child.type == "column" for child in node.children.values()):
+        return f'<div class="row">{children_html(node)}</div>'
+    if getattr(node, "children", None):
+        return children_html(node)
+    return ""
+
+
+def children_html(node):
+    return "\n".join(element_html(child) for child in node.children.values())
+
+
+def run_tab(tab):
+    """AppTest of one dashboard tab after it rendered with finished analytics."""
+    at = AppTest.from_file(str(APP), default_timeout=120)
+    at.query_params["tab"] = tab
+    at.run()
+    # The first run only starts the rollup and cohort jobs; export their results
+    if compute_service().busy():
+        compute_service().wait()
+        at.run()
+    if at.exception:
+        raise RuntimeError(f"{tab}: {at.exception[0].message}")
+    return at
+
+
+def render_tab(tab):
+    """Body HTML of one dashboard tab, as rendered by Dashboard.py."""
+    return children_html(run_tab(tab).main)
+
+
+def page_html(tab, body):
+    nav = " ".join(
+        f'<a href="{key}.html"{" class=active" if key == tab else ""}>{html.escape(label)}</a>'
+        for key, label in TABS.items()
+    )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(TABS[tab])} - Financial Dashboards Suite</title>"
+        f"<style>{PAGE_STYLE}</style>"
+        f"<script src='{PLOTLY_JS}'></script></head>"
+        f"<body><nav>{nav}</nav>\n{body}\n<script>{FIGURE_LOADER}</script></body></html>"
+    )
+
+
+def export(out_dir=SNAPSHOT_DIR, force=False):
+    """Write the snapshot bundle to ``out_dir``; False when it was already current."""
+    out_dir = Path(out_dir)
+    manifest_path = out_dir / "manifest.json"
+    current = source_hash()
+    if not force and manifest_path.exists():
+        if json.loads(manifest_path.read_text()).get("source_hash") == current:
+            return False
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / PLOTLY_JS).write_text(get_plotlyjs(), encoding="utf-8")
+    for tab in TABS:
+        (out_dir / f"{tab}.html").write_text(page_html(tab, render_tab(tab)), encoding="utf-8")
+    first = next(iter(TABS))
+    (out_dir / "index.html").write_text(
+        f"<!DOCTYPE html><meta http-equiv='refresh' content='0; url={first}.html'>",
+        encoding="utf-8",
+    )
+
+    # Written last, so an interrupted export is redone on the next run
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "source_hash": current,
+                "generated": datetime.now().isoformat(timespec="seconds"),
+                "pages": [f"{tab}.html" for tab in TABS],
+            },
+            indent=2,
+        )
+    )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the dashboards as static HTML")
+    parser.add_argument("--out", type=Path, default=SNAPSHOT_DIR, help="bundle directory")
+    parser.add_argument("--force", action="store_true", help="export even if nothing changed")
+    args = parser.parse_args()
+    if export(args.out, args.force):
+        print(f"Snapshot written to {args.out}")
+    else:
+        print(f"Snapshot in {args.out} is up to date")
+
+
+if __name__ == "__main__":
+    main()
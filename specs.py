@@ -0,0 +1,369 @@
+import ast
+import json
+import operator
+import os
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+import themes
+from cards import metric_cards
+from compute import current_store, transaction_cube
+from downsample import MAX_POINTS, zoom_range
+from figures import bar_figure, pie_figure, px_line_figure
+from kpis import format_money, format_number, format_percent
+from live_feed import live_panel
+from profiling import plot_chart, section
+from widgets import granularity_select, transaction_panel
+
+# Dashboards declared as data.
+#
+# Every file in dashboards/ (or DASHBOARD_SPECS_DIR) declares one tab: the
+# company it shows, its title, and a grid of rows whose cells hold components
+# (line, bar and pie charts, KPI cards, the transaction panel, markdown).
+# JSON specs always load; .yaml/.yml specs need PyYAML. See
+# dashboards/telda.json for a complete example.
+#
+# Specs are compiled into a RenderPlan once per process, and again only when a
+# file changes: colors are resolved, KPI formulas parsed, widget keys and
+# chart layouts fixed, and every component bound to a render function. A rerun
+# walks the plan of the tab being viewed and nothing else, so another brand is
+# another file, not more work on every rerun.
+
+SPECS_DIR = Path(
+    os.environ.get("DASHBOARD_SPECS_DIR", Path(__file__).parent / "dashboards")
+)
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+
+FORMULA_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+
+def specs_version(directory=SPECS_DIR):
+    """(name, size, mtime) of the spec files, for cache keys."""
+    if not directory.is_dir():
+        return ()
+    return tuple(
+        (path.name, path.stat().st_size, path.stat().st_mtime_ns)
+        for path in sorted(directory.iterdir())
+        if path.suffix in SPEC_SUFFIXES
+    )
+
+
+def read_spec(path):
+    """Spec file as a dict."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError as error:
+        raise ImportError(f"PyYAML is needed to read {path.name}") from error
+    return yaml.safe_load(text)
+
+
+def required(spec, name, where):
+    if name not in spec:
+        raise ValueError(f"{where}: missing {name!r}")
+    return spec[name]
+
+
+def color_value(name):
+    """A theme constant such as "TELDA_BROWN", or the color itself."""
+    return getattr(themes, name) if name.isupper() else name
+
+
+def compile_formula(text, company, period, where):
+    """Function of the store that evaluates KPI formula ``text`` for ``period``.
+
+    Names are metrics of ``company`` and ``other.metric`` a metric of another
+    company, combined with numbers, + - * / and parentheses. Values are taken
+    as reported, in each metric's own unit.
+    """
+    def build(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return lambda store: node.value
+        if isinstance(node, ast.Name):
+            return lambda store: store.value(company, node.id, period)
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            return lambda store: store.value(node.value.id, node.attr, period)
+        if isinstance(node, ast.BinOp) and type(node.op) in FORMULA_OPERATORS:
+            apply = FORMULA_OPERATORS[type(node.op)]
+            left, right = build(node.left), build(node.right)
+            return lambda store: apply(left(store), right(store))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = build(node.operand)
+            return lambda store: -operand(store)
+        raise ValueError(f"{where}: unsupported expression in formula {text!r}")
+
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as error:
+        raise ValueError(f"{where}: invalid formula {text!r}") from error
+    return build(tree.body)
+
+
+def compile_format(spec, where):
+    """Formatter for a KPI card: "money", "number" or "percent".
+
+    "money" and "number" append ``unit`` as written; scale the formula to
+    match (e.g. ``"users / 1000"`` with ``"unit": "K"``).
+    """
+    kind = spec.get("format", "number")
+    decimals = spec.get("decimals")
+    if kind == "money":
+        symbol, unit = spec.get("symbol", "$"), spec.get("unit", "")
+        return lambda value: format_money(value, symbol, unit, decimals)
+    if kind == "number":
+        unit = spec.get("unit", "")
+        return lambda value: f"{format_number(value, decimals)}{unit}"
+    if kind == "percent":
+        return lambda value: format_percent(value, decimals=decimals)
+    raise ValueError(f"{where}: unknown format {kind!r}")
+
+
+def compile_value(plan, spec, where):
+    """Function of the store returning the formatted value of a card-like ``spec``."""
+    formula = compile_formula(
+        required(spec, "value", where),
+        spec.get("company", plan.company),
+        required(spec, "period", where),
+        where,
+    )
+    fmt = compile_format(spec, where)
+    return lambda store: fmt(formula(store))
+
+
+def kpi_cards(plan, spec, where, name="cards"):
+    """(label, value function) of each card listed under ``name``."""
+    cards = []
+    for i, card in enumerate(spec.get(name, [])):
+        card_where = f"{where}.{name}[{i}]"
+        cards.append((required(card, "label", card_where), compile_value(plan, card, card_where)))
+    return cards
+
+
+def render_cards(cards, store, columns=None):
+    metric_cards([(label, value(store)) for label, value in cards], columns)
+
+
+# ---------- components ----------
+# Each takes the plan, the component's spec and its location for error
+# messages, and returns a render function of the store.
+
+
+def line_component(plan, spec, where):
+    metric = required(spec, "metric", where)
+    label = spec.get("label", metric.replace("_", " ").title())
+    color = color_value(spec.get("color", "#667eea"))
+    period = spec.get("period", "Period")
+    key = f"{plan.key}_{metric}"
+    granularity, zoom, dates = spec.get("granularity"), spec.get("zoom"), spec.get("dates")
+    layout = {"template": plan.template, **spec.get("layout", {})}
+
+    def render(store):
+        level = None
+        if granularity:
+            level = granularity_select(store, plan.company, metric, key=f"level_{key}")
+        data = store.frame(plan.company, {metric: label}, period=period, level=level)
+        # Day and month labels become a date axis; quarters and years stay labels
+        if dates and level in (None, "day", "month"):
+            data[period] = pd.to_datetime(data[period])
+        if zoom:
+            data = zoom_range(data, period, key=f"zoom_{key}")
+        plot_chart(px_line_figure(data, period, label, color=color, max_points=MAX_POINTS, **layout))
+
+    return render
+
+
+def bar_component(plan, spec, where):
+    metric = required(spec, "metric", where)
+    label = spec.get("label", metric.replace("_", " ").title())
+    colors = [color_value(color) for color in spec.get("colors", ["#667eea"])]
+    period = spec.get("period", "Period")
+    text_format = spec.get("text_format")
+    layout = {"template": plan.template, **spec.get("layout", {})}
+
+    def render(store):
+        data = store.frame(plan.company, {metric: label}, period=period)
+        plot_chart(bar_figure(data, period, label, colors, text_format, **layout))
+
+    return render
+
+
+def pie_component(plan, spec, where):
+    metric = required(spec, "metric", where)
+    colors = [color_value(color) for color in spec.get("colors", [])] or None
+    layout = {"template": plan.template, **spec.get("layout", {})}
+    # A card-like formula spec, or text shown as written
+    center = spec.get("center_text")
+    if isinstance(center, dict):
+        center = compile_value(plan, center, f"{where}.center_text")
+    hole = spec.get("hole", 0)
+
+    def render(store):
+        data = store.frame(plan.company, {metric: "Share"}, period="Segment")
+        figure_layout = layout
+        if center is not None:
+            text = center(store) if callable(center) else center
+            figure_layout = dict(
+                layout,
+                annotations=[dict(text=text, x=0.5, y=0.5, font_size=20, showarrow=False)],
+            )
+        plot_chart(pie_figure(data, "Segment", "Share", colors=colors, hole=hole, **figure_layout))
+
+    return render
+
+
+def kpis_component(plan, spec, where):
+    required(spec, "cards", where)
+    cards = kpi_cards(plan, spec, where)
+    columns = spec.get("columns")
+    return lambda store: render_cards(cards, store, columns)
+
+
+def transactions_component(plan, spec, where):
+    """Transaction panel when transaction files cover the company.
+
+    Without them the ``fallback`` cards are shown instead. ``cards`` are shown
+    either way: below the panel, or in one row with the fallback cards.
+    """
+    growth_by = spec.get("growth_by")
+    layout = {"template": plan.template, **spec.get("layout", {})}
+    fallback = kpi_cards(plan, spec, where, "fallback")
+    cards = kpi_cards(plan, spec, where, "cards")
+
+    def render(store):
+        cube = transaction_cube()
+        if cube is not None and plan.company in cube:
+            transaction_panel(cube, plan.company, growth_by, **layout)
+            if cards:
+                render_cards(cards, store)
+        elif fallback or cards:
+            render_cards(fallback + cards, store)
+
+    return render
+
+
+def markdown_component(plan, spec, where):
+    text = required(spec, "text", where)
+    return lambda store: st.markdown(text)
+
+
+COMPONENTS = {
+    "line": line_component,
+    "bar": bar_component,
+    "pie": pie_component,
+    "kpis": kpis_component,
+    "transactions": transactions_component,
+    "markdown": markdown_component,
+}
+
+
+class Cell:
+    """One grid cell: optional subheader, its components, optional notes."""
+
+    def __init__(self, plan, spec, where):
+        # A bare component is a cell holding just that component
+        items = spec.get("items", [spec] if "type" in spec else [])
+        self.title = spec.get("title")
+        self.notes = spec.get("notes")
+        self.section = spec.get("section", f"{plan.key}/{where.split(': ')[-1]}")
+        self.items = []
+        for i, item in enumerate(items):
+            item_where = f"{where}.items[{i}]"
+            kind = required(item, "type", item_where)
+            if kind not in COMPONENTS:
+                raise ValueError(f"{item_where}: unknown component type {kind!r}")
+            self.items.append(COMPONENTS[kind](plan, item, item_where))
+
+    def render(self, store):
+        with section(self.section):
+            if self.title:
+                st.subheader(self.title)
+            for render in self.items:
+                render(store)
+            if self.notes:
+                st.markdown(self.notes)
+
+
+class RenderPlan:
+    """A dashboard spec compiled into what its tab draws on each rerun."""
+
+    def __init__(self, spec, name):
+        self.key = spec.get("key", Path(name).stem)
+        self.company = required(spec, "company", name)
+        self.label = spec.get("label", self.key.title())
+        self.title = spec.get("title", self.label)
+        self.subtitle = spec.get("subtitle")
+        self.template = spec.get("template", self.company)
+        self.live = spec.get("live", False)
+        self.footer = spec.get("footer")
+        # (title, points) for the suite footer; points are KPI cards
+        self.summary = None
+        if "summary" in spec:
+            where = f"{name}: summary"
+            self.summary = (
+                required(spec["summary"], "title", where),
+                kpi_cards(self, spec["summary"], where, "points"),
+            )
+        self.order = spec.get("order", 0)
+        self.rows = [
+            [
+                Cell(self, cell, f"{name}: rows[{r}][{c}]")
+                for c, cell in enumerate(row.get("columns", []) if isinstance(row, dict) else row)
+            ]
+            for r, row in enumerate(required(spec, "rows", name))
+        ]
+
+    def render(self):
+        st.title(self.title)
+        if self.subtitle:
+            st.markdown(f"### {self.subtitle}")
+        st.markdown("---")
+
+        if self.live and st.session_state.get("live"):
+            live_panel(self.company)
+
+        store = current_store()
+        for row in self.rows:
+            if len(row) == 1:
+                row[0].render(store)
+                continue
+            for column, cell in zip(st.columns(len(row)), row):
+                with column:
+                    cell.render(store)
+
+        if self.footer:
+            st.markdown("---")
+            st.markdown(self.footer)
+
+    def summary_points(self, store):
+        """Footer lines of the summary, "<value> <label>" each."""
+        return [f"{value(store)} {label}" for label, value in self.summary[1]]
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def compiled_plans(directory, version):
+    """key -> RenderPlan for every spec in ``directory``, in tab order.
+
+    ``version`` (see specs_version) is part of the cache key, so an edited
+    spec is compiled again and the previous plans are dropped.
+    """
+    plans = {}
+    for name, _, _ in version:
+        plan = RenderPlan(read_spec(directory / name), name)
+        if plan.key in plans:
+            raise ValueError(f"{name}: dashboard key {plan.key!r} is already used")
+        plans[plan.key] = plan
+    return dict(sorted(plans.items(), key=lambda item: (item[1].order, item[0])))
+
+
+def dashboard_plans(directory=SPECS_DIR):
+    """Compiled plans of the current spec files; a stat per file on each call."""
+    return compiled_plans(directory, specs_version(directory))
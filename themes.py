@@ -0,0 +1,68 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Brand palettes and the Plotly templates registered for them.
+#
+# Plotly inlines a figure's whole template into its JSON, and the default one
+# Streamlit installs is ~3.3 KB of colorscales for trace types these
+# dashboards never draw, repeated in every chart. The templates registered
+# here hold only what the charts use (the brand colorway), so each figure
+# carries a few dozen bytes of template plus its own layout deltas.
+#
+# Templates compose with "+", e.g. template="revolut+white".
+
+# Revolut Youth
+REVOLUT_BLUE = "#667eea"
+REVOLUT_PURPLE = "#764ba2"
+
+# Telda
+TELDA_BURGUNDY = "#800020"
+TELDA_MAROON = "#4A0404"
+TELDA_BROWN = "#663300"
+
+# American Express
+AMEX_BURGUNDY = "#722F37"
+AMEX_LIGHT_RED = "#A85751"
+AMEX_MEDIUM_RED = "#8B3E3E"
+AMEX_WINE = "#800020"
+AMEX_ROSE = "#B76E79"
+AMEX_BLUSH = "#D8A7B1"
+AMEX_DUSTY_RED = "#B87070"
+
+# Line colors when companies are plotted together
+COMPANY_COLORS = {
+    "revolut": REVOLUT_BLUE,
+    "telda": TELDA_BROWN,
+    "amex": AMEX_BURGUNDY,
+    "visa": "#1A1F71",
+    "mastercard": "#EB001B",
+}
+
+BRANDS = {
+    "revolut": [REVOLUT_BLUE, REVOLUT_PURPLE],
+    "telda": [TELDA_BURGUNDY, TELDA_MAROON, TELDA_BROWN],
+    "amex": [AMEX_BURGUNDY, AMEX_LIGHT_RED, AMEX_MEDIUM_RED, AMEX_WINE, AMEX_ROSE],
+}
+
+# Template for figures built without a brand
+BASE_TEMPLATE = "dashboard"
+
+# Light grid on a white plot area, the parts of plotly_white the charts need
+WHITE = dict(
+    plot_bgcolor="white",
+    xaxis=dict(gridcolor="#EBF0F8", zerolinecolor="#EBF0F8"),
+    yaxis=dict(gridcolor="#EBF0F8", zerolinecolor="#EBF0F8"),
+)
+
+
+def register_templates():
+    """Add the brand, base and "white" templates to plotly.io.templates."""
+    for brand, colorway in BRANDS.items():
+        pio.templates[brand] = go.layout.Template(layout=dict(colorway=colorway))
+    pio.templates[BASE_TEMPLATE] = go.layout.Template(
+        layout=dict(colorway=[color for colorway in BRANDS.values() for color in colorway[:2]])
+    )
+    pio.templates["white"] = go.layout.Template(layout=WHITE)
+
+
+register_templates()
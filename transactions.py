@@ -0,0 +1,265 @@
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data_store import DATA_DIR
+
+# Filterable aggregates over transaction-level data.
+#
+# data/transactions/ (or DASHBOARD_TRANSACTIONS_DIR) holds Parquet files of
+# one row per card transaction:
+#   company, date, card_type, generation, age_band, amount (USD)
+#
+# The filters the dashboards offer (date range, card type, generation, age
+# band) are all dimensions of the rows, so the rows are aggregated once into a
+# daily cube of (count, amount) per company, date and dimension values. A
+# hundred million transactions become a few hundred thousand cells, and every
+# filtered total, breakdown or growth rate is a mask and a bincount over those
+# cells. The cube is built by the compute pool with DuckDB when it is
+# installed, otherwise by streaming record batches through Arrow's group_by.
+#
+# Run ``python transactions.py --rows 1000000`` to write demo data.
+
+TRANSACTIONS_DIR = Path(
+    os.environ.get("DASHBOARD_TRANSACTIONS_DIR", DATA_DIR / "transactions")
+)
+DIMENSIONS = ("card_type", "generation", "age_band")
+KEYS = ("company", "date") + DIMENSIONS
+
+
+def transaction_files(directory=TRANSACTIONS_DIR):
+    """The transaction Parquet files, watched by the refresh scheduler."""
+    return sorted(directory.glob("*.parquet")) if directory.is_dir() else []
+
+
+def aggregate_duckdb(paths):
+    import duckdb
+
+    keys = ", ".join(KEYS)
+    relation = duckdb.connect().read_parquet([str(path) for path in paths])
+    return relation.aggregate(f"{keys}, count(*) AS count, sum(amount) AS amount", keys).df()
+
+
+def combine(partials):
+    """One cell per key from partial (count, sum) aggregates."""
+    return (
+        pa.concat_tables(partials)
+        .group_by(list(KEYS))
+        .aggregate([("count", "sum"), ("amount", "sum")])
+        .select(list(KEYS) + ["count_sum", "amount_sum"])
+        .rename_columns(list(KEYS) + ["count", "amount"])
+    )
+
+
+def aggregate_arrow(paths, fold_rows=2_000_000):
+    """Cube cells from record batches, so memory stays bounded by the batch size.
+
+    Partial aggregates are folded together whenever they pass ``fold_rows``.
+    """
+    import pyarrow.dataset as ds  # loads the Parquet readers; only when building
+
+    dataset = ds.dataset([str(path) for path in paths], format="parquet")
+    partials, pending = [], 0
+    for batch in dataset.to_batches(columns=list(KEYS) + ["amount"]):
+        table = pa.Table.from_batches([batch])
+        for name in KEYS:
+            if pa.types.is_dictionary(table.schema.field(name).type):
+                table = table.set_column(
+                    table.schema.get_field_index(name), name, table[name].cast(pa.string())
+                )
+        partial = (
+            table.group_by(list(KEYS))
+            .aggregate([("amount", "count"), ("amount", "sum")])
+            .select(list(KEYS) + ["amount_count", "amount_sum"])
+            .rename_columns(list(KEYS) + ["count", "amount"])
+        )
+        partials.append(partial)
+        pending += len(partial)
+        if pending > fold_rows:
+            partials = [combine(partials)]
+            pending = len(partials[0])
+    return combine(partials).to_pandas()
+
+
+def build_cube(directory=TRANSACTIONS_DIR):
+    """TransactionCube of the files in ``directory``, or None without any."""
+    paths = transaction_files(directory)
+    if not paths:
+        return None
+    try:
+        cells = aggregate_duckdb(paths)
+    except ImportError:
+        cells = aggregate_arrow(paths)
+    return TransactionCube(cells)
+
+
+class TransactionCube:
+    """Daily (count, amount) cells per company and dimension values."""
+
+    def __init__(self, cells):
+        cells = cells.assign(date=pd.to_datetime(cells["date"]).dt.normalize())
+        cells = cells.sort_values(["company", "date"], kind="stable").reset_index(drop=True)
+        self.days = cells["date"].to_numpy(dtype="datetime64[D]")
+        self.count = cells["count"].to_numpy(dtype=np.int64)
+        self.amount = cells["amount"].to_numpy(dtype=np.float64)
+        self.codes, self.values = {}, {}
+        for name in DIMENSIONS:
+            codes, values = pd.factorize(cells[name], sort=True)
+            self.codes[name], self.values[name] = codes, list(values)
+
+        # Row range of each company in the sorted cells
+        companies = cells["company"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, companies[1:] != companies[:-1]])
+        stops = np.r_[starts[1:], len(companies)]
+        self.ranges = {companies[a]: (a, b) for a, b in zip(starts, stops)}
+
+    def __contains__(self, company):
+        return company in self.ranges
+
+    def date_range(self, company):
+        start, stop = self.ranges[company]
+        return self.days[start].astype(object), self.days[stop - 1].astype(object)
+
+    def options(self, company, name):
+        """Values of dimension ``name`` that occur for ``company``."""
+        start, stop = self.ranges[company]
+        present = np.unique(self.codes[name][start:stop])
+        return [self.values[name][code] for code in present]
+
+    def rows(self, company, start, end, filters):
+        """Cell positions for ``company`` between dates ``start`` and ``end``.
+
+        ``filters`` maps dimension names to the values to keep; missing or
+        None means every value.
+        """
+        first, last = self.ranges[company]
+        days = self.days[first:last]
+        lo = first + np.searchsorted(days, np.datetime64(start, "D"), side="left")
+        hi = first + np.searchsorted(days, np.datetime64(end, "D"), side="right")
+        keep = np.ones(hi - lo, dtype=bool)
+        for name, selected in (filters or {}).items():
+            if selected is None:
+                continue
+            wanted = np.isin(self.values[name], selected)
+            keep &= wanted[self.codes[name][lo:hi]]
+        return np.arange(lo, hi)[keep]
+
+    def totals(self, company, start, end, filters=None):
+        """(transactions, amount) of the filtered cells."""
+        rows = self.rows(company, start, end, filters)
+        return int(self.count[rows].sum()), float(self.amount[rows].sum())
+
+    def breakdown(self, company, name, start, end, filters=None):
+        """``name``/``count``/``amount`` per value of dimension ``name``."""
+        rows = self.rows(company, start, end, filters)
+        size = len(self.values[name])
+        codes = self.codes[name][rows]
+        frame = pd.DataFrame(
+            {
+                name: self.values[name],
+                "count": np.bincount(codes, self.count[rows], minlength=size).astype(np.int64),
+                "amount": np.bincount(codes, self.amount[rows], minlength=size),
+            }
+        )
+        present = self.options(company, name)
+        return frame[frame[name].isin(present)].reset_index(drop=True)
+
+    def growth(self, company, name, start, end, filters=None):
+        """``name``/``growth`` (%) of amount against the preceding period of equal length."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        length = end - start + pd.Timedelta(days=1)
+        current = self.breakdown(company, name, start, end, filters)
+        previous = self.breakdown(company, name, start - length, start - pd.Timedelta(days=1), filters)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (current["amount"] / previous["amount"].where(previous["amount"] > 0) - 1) * 100
+        return current[[name]].assign(growth=growth.to_numpy())
+
+
+GENERATIONS = ["Baby Boomers", "Gen X", "Millennials", "Gen Z"]
+AGE_BANDS = ["18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+
+
+def generation_codes(ages, year):
+    """Index into GENERATIONS of customers aged ``ages`` in ``year``."""
+    return np.searchsorted([1965, 1981, 1997], year - ages, side="right")
+
+
+def age_band_codes(ages):
+    """Index into AGE_BANDS of each age."""
+    return np.searchsorted([25, 35, 45, 55, 65], ages, side="right")
+
+
+# Demo data: (cards, mean amount, share of rows) per company
+DEMO_COMPANIES = {
+    "telda": (["Prepaid", "Virtual"], 15.0, 0.6),
+    "amex": (["Platinum", "Gold", "Green", "Cobrand"], 1250.0, 0.4),
+}
+# Yearly growth of transaction count per generation in the demo data
+DEMO_GROWTH = {"Baby Boomers": 0.04, "Gen X": 0.07, "Millennials": 0.12, "Gen Z": 0.16}
+
+
+def dictionary(codes, labels):
+    return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int8()), pa.array(labels))
+
+
+def simulate(rows, seed=0, first_year=2023, years=2):
+    """Synthetic transactions for demos and benchmarks, ``rows`` in total.
+
+    Built from integer codes straight into dictionary columns, so a chunk of
+    millions of rows never materializes its strings.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(DEMO_COMPANIES)
+    cards = [card for name in names for card in DEMO_COMPANIES[name][0]]
+    n_cards = np.array([len(DEMO_COMPANIES[name][0]) for name in names])
+    first_card = np.cumsum(n_cards) - n_cards
+    means = np.array([DEMO_COMPANIES[name][1] for name in names])
+
+    company = rng.choice(len(names), rows, p=[DEMO_COMPANIES[name][2] for name in names])
+    ages = rng.integers(18, 80, rows)
+    generations = generation_codes(ages, first_year + years - 1)
+
+    # Later years get more rows, growing at the generation's rate
+    rates = np.array([DEMO_GROWTH[name] for name in GENERATIONS])[generations]
+    weights = np.cumsum((1 + rates[:, None]) ** np.arange(years), axis=1)
+    offset = (rng.random(rows)[:, None] * weights[:, -1:] > weights).sum(axis=1)
+    year_starts = np.array([f"{first_year + y}-01-01" for y in range(years)], dtype="datetime64[D]")
+    dates = year_starts[offset] + rng.integers(0, 365, rows).astype("timedelta64[D]")
+
+    order = np.lexsort((dates, company))
+    company, ages, generations, dates = company[order], ages[order], generations[order], dates[order]
+    card = first_card[company] + (rng.random(rows) * n_cards[company]).astype(np.int64)
+    amount = rng.lognormal(np.log(means[company]) - 0.5, 1.0).round(2)
+    return pa.table(
+        {
+            "company": dictionary(company, names),
+            "date": pa.array(dates, pa.date32()),
+            "card_type": dictionary(card, cards),
+            "generation": dictionary(generations, GENERATIONS),
+            "age_band": dictionary(age_band_codes(ages), AGE_BANDS),
+            "amount": amount,
+        }
+    )
+
+
+def write_demo(directory=TRANSACTIONS_DIR, rows=1_000_000, chunk=5_000_000, seed=0):
+    """Write ``rows`` synthetic transactions as Parquet files of ``chunk`` rows."""
+    import pyarrow.parquet as pq
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for part, offset in enumerate(range(0, rows, chunk)):
+        table = simulate(min(chunk, rows - offset), seed=seed + part)
+        pq.write_table(table, directory / f"part-{part:04d}.parquet", row_group_size=1_000_000)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write demo transaction data")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--out", type=Path, default=TRANSACTIONS_DIR)
+    args = parser.parse_args()
+    write_demo(args.out, args.rows)
+    print(f"Wrote {args.rows:,} transactions to {args.out}")
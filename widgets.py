@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+import streamlit as st
+
+from cards import BAD, GOOD, card_grid, metric_cards, phase_card
+from figures import px_bar_figure
+from kpis import format_money, format_number, format_percent
+from profiling import plot_chart
+from scenarios import BASE_CHURN, CAC_GRID, CHURN_GRID, INVESTMENT_GRID
+from transactions import DIMENSIONS
+
+# Widgets shared by the dashboards written in Dashboard.py and the ones
+# declared in dashboards/ (see specs.py).
+
+
+def granularity_select(store, company, metric, key):
+    """Granularity picked above a time chart; None keeps the reported periods.
+
+    Levels come from the precomputed rollups, so switching is a lookup. The
+    selector is hidden when a metric has no coarser level to switch to.
+    """
+    levels = store.rollups.levels(company, metric)
+    if len(levels) < 2:
+        return None
+    level = st.radio(
+        "Granularity",
+        levels,
+        format_func=str.title,
+        horizontal=True,
+        key=key,
+        label_visibility="collapsed",
+    )
+    return None if level == levels[0] else level
+
+
+DIMENSION_LABELS = {"card_type": "Card type", "generation": "Generation", "age_band": "Age band"}
+
+
+def transaction_filters(cube, company):
+    """Date range and dimension filters for ``company``'s transactions.
+
+    Returns (start, end, filters); a dimension with every value selected is
+    left unfiltered.
+    """
+    first, last = cube.date_range(company)
+    with st.expander("🔎 Filter transactions"):
+        start, end = st.slider(
+            "Dates",
+            min_value=first,
+            max_value=last,
+            value=(max(first, last - timedelta(days=364)), last),
+            key=f"tx_{company}_dates",
+        )
+        filters = {}
+        for col, name in zip(st.columns(len(DIMENSIONS)), DIMENSIONS):
+            options = cube.options(company, name)
+            with col:
+                selected = st.multiselect(
+                    DIMENSION_LABELS[name], options, default=options, key=f"tx_{company}_{name}"
+                )
+            filters[name] = None if len(selected) == len(options) else selected
+    return start, end, filters
+
+
+@st.fragment
+def transaction_panel(cube, company, growth_by=None, **layout):
+    """Filtered transaction totals, plus amount growth per ``growth_by`` value.
+
+    A fragment: changing a filter reruns only this panel's queries and chart.
+    """
+    start, end, filters = transaction_filters(cube, company)
+    count, volume = cube.totals(company, start, end, filters)
+    metric_cards(
+        [
+            ("Transaction Volume", format_money(volume / 1e6, "$", "M", decimals=1)),
+            ("Transactions", format_number(count, decimals=0)),
+            ("Avg. Transaction Value", format_money(volume / count if count else 0, "$", decimals=0)),
+        ]
+    )
+
+    if growth_by is not None:
+        growth = cube.growth(company, growth_by, start, end, filters)
+        fig = px_bar_figure(
+            growth.sort_values("growth", ascending=False),
+            growth_by,
+            "growth",
+            xaxis_title=DIMENSION_LABELS[growth_by],
+            yaxis_title="Growth (%)",
+            **layout,
+        )
+        plot_chart(fig)
+        st.caption(f"Spend from {start:%d %b %Y} to {end:%d %b %Y} against the preceding period of equal length")
+
+
+def grid_slider(label, grid, value, key, format):
+    """Slider over the span of ``grid`` in its own steps, so values are grid points."""
+    return st.slider(
+        label,
+        min_value=float(grid[0]),
+        max_value=float(grid[-1]),
+        value=float(value),
+        step=float(grid[1] - grid[0]),
+        format=format,
+        key=key,
+    )
+
+
+@st.fragment
+def phase_scenario_panel(cube, phases, symbol="£", unit="M"):
+    """Phase cards under investment, CAC and churn assumptions picked with sliders.
+
+    ``cube`` is a scenarios.ScenarioCube and ``phases`` the cards'
+    (phase, title, description) dicts. A fragment: moving a slider reruns
+    only this panel, and its results are looked up in the precomputed cube.
+    """
+    with st.expander("🎛️ Scenario assumptions"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            investment = grid_slider("Investment", INVESTMENT_GRID, 1.0, "scenario_investment", "%.2fx")
+        with col2:
+            cac = grid_slider("Customer acquisition cost", CAC_GRID, 1.0, "scenario_cac", "%.2fx")
+        with col3:
+            churn = grid_slider("Churn per phase", CHURN_GRID, BASE_CHURN, "scenario_churn", "%.2f")
+        st.caption(
+            "Investment and CAC scale the reported figures; revenue follows the customers "
+            f"acquired and still active. 1.00x, 1.00x and {BASE_CHURN:.2f} churn reproduce the reported phases."
+        )
+
+    values = cube.at(investment, cac, churn).set_index("phase")
+    payback = cube.payback_at(investment, cac, churn)
+    total = values.iloc[-1]
+    metric_cards(
+        [
+            ("Total Investment", format_money(values["investment"].sum(), symbol, unit, decimals=1)),
+            ("Total Revenue", format_money(values["revenue"].sum(), symbol, unit, decimals=1)),
+            ("Cumulative ROI", format_percent(total["cumulative_roi"], signed=True, decimals=0)),
+            ("Payback", "Not reached" if payback != payback else f"{payback:.1f} phases"),
+        ]
+    )
+    cards = []
+    for phase in phases:
+        row = values.loc[phase["phase"]]
+        cards.append(
+            phase_card(
+                phase["title"],
+                phase["description"],
+                [
+                    ("Investment", format_money(row["investment"], symbol, unit)),
+                    ("Revenue", format_money(row["revenue"], symbol, unit)),
+                ],
+                f"ROI: {format_percent(row['roi'], signed=True)}",
+                BAD if row["roi"] < 0 else GOOD,
+            )
+        )
+    card_grid(cards)
@@ -0,0 +1,154 @@
+import base64
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Wire format of the figures sent to the browser.
+#
+# Streamlit sends every chart as Plotly figure JSON. With the default "json"
+# format that is Plotly's own encoding: numpy arrays become base64 float64 or
+# int typed arrays whatever their length, while Python lists and dates are
+# written out as text.
+#
+# The "binary" format (DASHBOARD_WIRE_FORMAT=binary) re-encodes the numeric
+# arrays of a figure for the wire:
+#
+#   - arrays with at least BINARY_THRESHOLD elements, lists included, become
+#     typed arrays ({"dtype", "bdata"}, decoded by Plotly.js itself) in the
+#     narrowest dtype that holds every value exactly: whole numbers as 8, 16
+#     or 32-bit ints, floats as float32 when that round-trips, else float64
+#   - dates on x and y become float64 milliseconds since the epoch, and their
+#     axis is declared a date axis, instead of ISO strings
+#   - shorter arrays are written as plain JSON lists, which take fewer bytes
+#     than a typed array's base64 and header
+#
+# DASHBOARD_BINARY_THRESHOLD sets the element count (100 by default). To also
+# compress whole messages, turn on Streamlit's
+# server.enableWebsocketCompression; typed arrays and compression combine.
+#
+# The builders in figures.py cache their figures already encoded, keyed on
+# the format and threshold, so a figure is encoded once, when it is built.
+
+WIRE_FORMAT = os.environ.get("DASHBOARD_WIRE_FORMAT", "json")
+BINARY_THRESHOLD = int(os.environ.get("DASHBOARD_BINARY_THRESHOLD", 100))
+
+# Plotly.js typed array dtypes, narrowest first
+INT_DTYPES = {
+    "i1": np.int8,
+    "u1": np.uint8,
+    "i2": np.int16,
+    "u2": np.uint16,
+    "i4": np.int32,
+    "u4": np.uint32,
+}
+# Same keys Plotly leaves alone when it encodes typed arrays
+SKIPPED_KEYS = ("geojson", "layer", "layers", "range")
+CARTESIAN_TYPES = ("scatter", "scattergl", "bar", "histogram", "box", "violin", "heatmap")
+
+
+def typed_array(values):
+    """Plotly.js typed array spec of numeric ``values`` in the narrowest lossless dtype."""
+    values = np.asarray(values)
+    if values.dtype.kind == "f" and np.isfinite(values).all():
+        with np.errstate(invalid="ignore"):
+            whole = values.astype(np.int64)
+        if (whole == values).all():
+            values = whole
+    if values.dtype.kind in "iu":
+        low, high = values.min(), values.max()
+        for code, dtype in INT_DTYPES.items():
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return {"dtype": code, "bdata": encode(values.astype(dtype))}
+        values = values.astype(np.float64)
+    single = values.astype(np.float32)
+    if np.array_equal(single, values, equal_nan=True):
+        return {"dtype": "f4", "bdata": encode(single)}
+    return {"dtype": "f8", "bdata": encode(values.astype(np.float64))}
+
+
+def encode(values):
+    """base64 of ``values`` as little-endian bytes, the order Plotly.js reads."""
+    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    return base64.b64encode(values).decode("ascii")
+
+
+def decode(spec):
+    """numpy array of a typed array spec."""
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype="<" + spec["dtype"])
+
+
+def numeric(values):
+    """``values`` as a numeric numpy array, or None if they are not all numbers."""
+    if isinstance(values, np.ndarray):
+        return values if values.dtype.kind in "iuf" else None
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return np.asarray(values, dtype=np.float64)
+    return None
+
+
+def binary_value(value, threshold):
+    """``value`` with its numeric arrays re-encoded for the binary format."""
+    if isinstance(value, dict):
+        if "bdata" in value and "shape" not in value:
+            value = decode(value)  # Plotly's own encoding
+        elif "bdata" in value:
+            return value
+        else:
+            return {
+                key: item if key in SKIPPED_KEYS else binary_value(item, threshold)
+                for key, item in value.items()
+            }
+    if isinstance(value, np.ndarray):
+        array = numeric(value)
+        if array is None or not array.size:
+            return value  # dates and text are left to Plotly
+        return array.tolist() if len(array) < threshold else typed_array(array)
+    if isinstance(value, (list, tuple)):
+        array = numeric(value) if len(value) >= threshold else None
+        if array is not None and array.size:
+            return typed_array(array)
+        return [binary_value(item, threshold) for item in value]
+    return value
+
+
+def date_axes(figure, threshold):
+    """Send long datetime64 x/y arrays as epoch milliseconds on declared date axes."""
+    layout = figure["layout"]
+    for trace in figure.get("data", []):
+        if trace.get("type", "scatter") not in CARTESIAN_TYPES:
+            continue
+        for letter in ("x", "y"):
+            values = trace.get(letter)
+            if not isinstance(values, np.ndarray) or values.dtype.kind != "M":
+                continue
+            name = letter + "axis" + trace.get(f"{letter}axis", letter)[1:]
+            axis = layout.get(name, {})
+            if len(values) < threshold or axis.get("type", "-") not in ("-", "date"):
+                continue
+            layout[name] = dict(axis, type="date")
+            millis = values.astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+            millis[np.isnat(values)] = np.nan
+            trace[letter] = {"dtype": "f8", "bdata": encode(millis)}
+
+
+def binary_figure(fig, threshold=None):
+    """Figure dict of ``fig`` in the binary wire format."""
+    threshold = BINARY_THRESHOLD if threshold is None else threshold
+    figure = fig.to_dict() if isinstance(fig, go.Figure) else fig
+    figure = dict(figure, layout=dict(figure.get("layout", {})))
+    figure["data"] = [dict(trace) for trace in figure.get("data", [])]
+    date_axes(figure, threshold)
+    return binary_value(figure, threshold)
+
+
+def wire_figure(fig, wire_format=None, threshold=None):
+    """``fig`` as it should be passed to st.plotly_chart for ``wire_format``."""
+    wire_format = wire_format or WIRE_FORMAT
+    if wire_format not in ("json", "binary"):
+        raise ValueError(f"Unknown wire format: {wire_format}")
+    if wire_format == "json":
+        return fig
+    # Already validated when it was built; only the array encoding changes
+    return go.Figure(binary_figure(fig, threshold), _validate=False)